@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Faux daemon Docker pour les benchmarks : sous-ensemble de l'API Engine servi sur un socket unix.
+
+Sert --containers conteneurs générés de façon déterministe (ports, montages, réseaux configurables), avec une
+latence injectable par requête. Routes couvertes : version/ping, listing, inspect, stats, create/start/stop/remove,
+exec (détection du shell), images (inspect, pull d'une durée --pull-ms, suppression), réseaux (liste, création,
+connexion), volumes, /system/df et prune, et un flux d'événements optionnellement alimenté (--events-per-second).
+Compteurs d'appels par route : GET /_fake/calls, remise à zéro : POST /_fake/reset; latence modifiable en cours
+de route : POST /_fake/latency?ms=N.
+"""
+
+import argparse
+import hashlib
+import http.server
+import json
+import os
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+import urllib.parse
+
+API_VERSION = "1.43"
+# Même regroupement des routes que les mesures de docker-manager.py
+ANONYMOUS_VOLUME = re.compile(r"^[0-9a-f]{64}$")
+PATH_ARGUMENT = re.compile(r"^(/(?:containers|exec|images|networks|volumes)/)(?!json$|create$|prune$)[^/]+")
+
+
+class FakeDocker:
+    """État du faux daemon, partagé par toutes les connexions"""
+
+    def __init__(self, containers, ports, mounts, networks, latency, pull_delay=0, prefix="bench"):
+        self.prefix = prefix  # Noms et IDs distincts pour plusieurs faux daemons côte à côte
+        self.latency = latency
+        self.pull_delay = pull_delay
+        self.lock = threading.Lock()
+        self.containers = {}  # ID -> conteneur (résumé + champs d'inspect)
+        # Images présentes localement, dont quelques images orphelines sans tag
+        self.images = {f"registry.local/app-{i}:latest" for i in range(50)} | {f"<none>:{i}" for i in range(5)}
+        self.networks = {"bridge", "host", "none"} | {f"net-{i}" for i in range(20)}
+        self.volumes = {f"vol-{i}": i % 2 for i in range(10)}  # Nom -> nombre de conteneurs qui l'utilisent
+        self.volumes.update({hashlib.sha256(f"anon-{i}".encode()).hexdigest(): 0 for i in range(3)})  # Anonymes
+        self.created = 0
+        self.calls = {}  # Route -> nombre d'appels
+        self.subscribers = []  # Files des flux d'événements ouverts
+        self.listing = None  # Corps /containers/json sérialisé, invalidé à chaque changement d'état
+        for i in range(containers):
+            self.add(i, ports, mounts, networks)
+
+    def add(self, i, ports, mounts, networks):
+        cid = hashlib.sha256(f"{self.prefix}-{i}".encode()).hexdigest()
+        self.containers[cid] = {
+            "index": i,
+            "name": f"{self.prefix}-{i:05d}",
+            "image": f"registry.local/app-{i % 50}:latest",
+            "image_id": "sha256:" + hashlib.sha256(f"image-{i % 50}".encode()).hexdigest(),
+            "running": i % 4 != 0,
+            "created": 1700000000 + i,
+            "ports": [(8000 + i * ports + p, 80 + p) for p in range(ports)],
+            "mounts": [f"/srv/{self.prefix}-{i}/data{m}:/data{m}" for m in range(mounts)],
+            "networks": [f"net-{(i + n) % 20}" for n in range(networks)] or ["bridge"],
+        }
+
+    def create(self, name, config):
+        """Conteneur créé par POST /containers/create, arrêté jusqu'à son start"""
+        image = config.get("Image", "")
+        if not any(image == present or f"{image}:latest" == present for present in self.images):
+            return None
+        with self.lock:
+            self.created += 1
+            cid = hashlib.sha256(f"{self.prefix}-created-{self.created}".encode()).hexdigest()
+            network = (config.get("HostConfig") or {}).get("NetworkMode") or "bridge"
+            self.containers[cid] = {
+                "index": len(self.containers), "name": name or cid[:12], "image": image,
+                "image_id": "sha256:" + hashlib.sha256(image.encode()).hexdigest(), "running": False,
+                "created": int(time.time()), "ports": [], "mounts": [], "networks": [network],
+            }
+            self.listing = None
+        return cid
+
+    def pull(self, image):
+        time.sleep(self.pull_delay)
+        with self.lock:
+            self.images.add(image)
+
+    def df(self):
+        """Réponse /system/df : 100 Mo par image, 1 Mo écrit par conteneur, 10 Mo par volume"""
+        with self.lock:
+            used = {}
+            for container in self.containers.values():
+                used[container["image"]] = used.get(container["image"], 0) + 1
+            return {
+                "LayersSize": len(self.images) * 100 * 2 ** 20,
+                "Images": [{"Id": "sha256:" + hashlib.sha256(image.encode()).hexdigest(),
+                            "RepoTags": [] if image.startswith("<none>") else [image], "Size": 100 * 2 ** 20,
+                            "SharedSize": 20 * 2 ** 20, "Containers": used.get(image, 0), "Created": 1700000000}
+                           for image in sorted(self.images)],
+                "Containers": [dict(self.summary(cid, container), SizeRw=2 ** 20) for cid, container in self.containers.items()],
+                "Volumes": [{"Name": name, "Driver": "local", "UsageData": {"Size": 10 * 2 ** 20, "RefCount": refs}}
+                            for name, refs in sorted(self.volumes.items())],
+                "BuildCache": [],
+            }
+
+    def prune(self, kind, version=API_VERSION, filters=None):
+        with self.lock:
+            if kind == "containers":
+                deleted = [cid for cid, container in self.containers.items() if not container["running"]]
+                for cid in deleted:
+                    del self.containers[cid]
+                self.listing = None
+                return {"ContainersDeleted": deleted, "SpaceReclaimed": len(deleted) * 2 ** 20}
+            if kind == "images":
+                deleted = [image for image in self.images if image.startswith("<none>")]
+                self.images.difference_update(deleted)
+                return {"ImagesDeleted": [{"Deleted": image} for image in deleted],
+                        "SpaceReclaimed": len(deleted) * 80 * 2 ** 20}
+            # Comme dockerd : depuis l'API 1.42, seuls les volumes anonymes sans le filtre all
+            named = (filters or {}).get("all") in (["true"], ["1"]) \
+                or tuple(map(int, version.split("."))) < (1, 42)
+            deleted = [name for name, refs in self.volumes.items()
+                       if not refs and (named or ANONYMOUS_VOLUME.match(name))]
+            for name in deleted:
+                del self.volumes[name]
+            return {"VolumesDeleted": deleted, "SpaceReclaimed": len(deleted) * 10 * 2 ** 20}
+
+    def record(self, method, path):
+        route = f"{method} " + PATH_ARGUMENT.sub(r"\1{id}", path)
+        with self.lock:
+            self.calls[route] = self.calls.get(route, 0) + 1
+
+    def find(self, ref):
+        """Conteneur par ID (ou préfixe) ou par nom"""
+        with self.lock:
+            if ref in self.containers:
+                return ref
+            for cid, container in self.containers.items():
+                if cid.startswith(ref) or container["name"] == ref.lstrip("/"):
+                    return cid
+        return None
+
+    @staticmethod
+    def summary(cid, container):
+        return {
+            "Id": cid, "Names": [f"/{container['name']}"], "Image": container["image"], "ImageID": container["image_id"],
+            "Command": "/entrypoint.sh", "Created": container["created"],
+            "State": "running" if container["running"] else "exited",
+            "Status": "Up 2 hours" if container["running"] else "Exited (0) 2 hours ago",
+            "Ports": [{"IP": "0.0.0.0", "PrivatePort": private, "PublicPort": public, "Type": "tcp"}
+                      for public, private in container["ports"]],
+            "Labels": {}, "NetworkSettings": {"Networks": {network: {} for network in container["networks"]}},
+            "Mounts": [{"Type": "bind", "Source": mount.split(":")[0], "Destination": mount.split(":")[1]}
+                       for mount in container["mounts"]],
+        }
+
+    def list_body(self, filters):
+        ids = filters.get("id")
+        if ids:
+            with self.lock:
+                matches = [(cid, c) for cid, c in self.containers.items() if any(cid.startswith(ref) for ref in ids)]
+            return json.dumps([self.summary(cid, c) for cid, c in matches]).encode()
+        with self.lock:
+            if self.listing is None:
+                self.listing = json.dumps([self.summary(cid, c) for cid, c in self.containers.items()]).encode()
+            return self.listing
+
+    def inspect(self, cid):
+        with self.lock:
+            container = dict(self.containers[cid])
+        return {
+            "Id": cid, "Name": f"/{container['name']}", "Created": "2024-01-01T00:00:00Z", "Image": container["image_id"],
+            "State": {"Running": container["running"], "Status": "running" if container["running"] else "exited"},
+            "Config": {"Image": container["image"], "Cmd": ["serve", "--port", "80"], "Env": ["MODE=bench"]},
+            "HostConfig": {"AutoRemove": False, "Binds": container["mounts"],
+                           "PortBindings": {f"{private}/tcp": [{"HostIp": "", "HostPort": str(public)}]
+                                            for public, private in container["ports"]}},
+            "NetworkSettings": {"Ports": {f"{private}/tcp": [{"HostIp": "", "HostPort": str(public)}]
+                                          for public, private in container["ports"]},
+                                "Networks": {network: {} for network in container["networks"]}},
+        }
+
+    def set_state(self, cid, running=None, remove=False):
+        with self.lock:
+            if remove:
+                del self.containers[cid]
+            else:
+                self.containers[cid]["running"] = running
+            self.listing = None
+            subscribers = list(self.subscribers)
+        action = "destroy" if remove else ("start" if running else "die")
+        event = json.dumps({"Type": "container", "Action": action, "id": cid, "Actor": {"ID": cid},
+                            "time": int(time.time())}).encode()
+        for subscriber in subscribers:
+            subscriber.append(event)
+
+    def churn(self, rate):
+        """Génère des événements : bascule l'état de conteneurs tirés au hasard"""
+        generator = random.Random(0)
+        while True:
+            time.sleep(1 / rate)
+            with self.lock:
+                if not self.containers:
+                    continue
+                cid = generator.choice(list(self.containers))
+                running = not self.containers[cid]["running"]
+            self.set_state(cid, running=running)
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def reply(self, code, body=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        body = body or b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self, method):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""  # Toujours consommé pour garder la connexion utilisable
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        version = re.match(r"^/v([\d.]+)", url.path)
+        version = version.group(1) if version else API_VERSION
+        path = re.sub(r"^/v[\d.]+", "", url.path)
+        if path == "/_fake/calls":
+            with fake.lock:
+                return self.reply(200, dict(fake.calls))
+        if path == "/_fake/latency":
+            fake.latency = float(query.get("ms", ["0"])[0]) / 1000  # Daemon rendu lent en cours de route
+            return self.reply(204)
+        if path == "/_fake/reset":
+            with fake.lock:
+                fake.calls.clear()
+            return self.reply(204)
+        fake.record(method, path)
+        if fake.latency:
+            time.sleep(fake.latency)
+        if path in ("/version", "/_ping"):
+            if path == "/_ping":
+                return self.reply(200, b"OK")
+            return self.reply(200, {"ApiVersion": API_VERSION, "Version": "24.0.0-fake", "MinAPIVersion": "1.12"})
+        if path == "/containers/json" and method == "GET":
+            return self.reply(200, fake.list_body(json.loads(query.get("filters", ["{}"])[0])))
+        if path == "/events" and method == "GET":
+            return self.events()
+        if path == "/containers/create" and method == "POST":
+            cid = fake.create(query.get("name", [""])[0], json.loads(body or b"{}"))
+            if cid is None:
+                return self.reply(404, {"message": "No such image"})
+            return self.reply(201, {"Id": cid, "Warnings": []})
+        if path == "/images/create" and method == "POST":
+            image = query["fromImage"][0] + ":" + query.get("tag", ["latest"])[0]
+            fake.pull(image)
+            return self.reply(200, json.dumps({"status": f"Downloaded newer image for {image}"}).encode())
+        if path == "/system/df":
+            return self.reply(200, fake.df())
+        match = re.match(r"^/(containers|images|volumes)/prune$", path)
+        if match and method == "POST":
+            return self.reply(200, fake.prune(match.group(1), version, json.loads(query.get("filters", ["{}"])[0])))
+        match = re.match(r"^/volumes/([^/]+)$", path)
+        if match and method == "DELETE":
+            with fake.lock:
+                if fake.volumes.pop(match.group(1), None) is None:
+                    return self.reply(404, {"message": f"no such volume: {match.group(1)}"})
+            return self.reply(204)
+        match = re.match(r"^/images/(.+)$", path)
+        if match and method == "DELETE":
+            reference = urllib.parse.unquote(match.group(1))
+            with fake.lock:
+                images = [image for image in fake.images if reference in (image, "sha256:" + hashlib.sha256(image.encode()).hexdigest())]
+                if not images:
+                    return self.reply(404, {"message": f"No such image: {reference}"})
+                if any(container["image"] == images[0] for container in fake.containers.values()):
+                    return self.reply(409, {"message": "image is being used by a container"})
+                fake.images.discard(images[0])
+            return self.reply(200, [{"Deleted": reference}])
+        match = re.match(r"^/images/(.+)/json$", path)
+        if match:
+            image = urllib.parse.unquote(match.group(1))
+            with fake.lock:
+                present = image in fake.images or f"{image}:latest" in fake.images
+            if not present:
+                return self.reply(404, {"message": f"No such image: {image}"})
+            return self.reply(200, {"Id": "sha256:" + hashlib.sha256(image.encode()).hexdigest(), "RepoTags": [image]})
+        if path == "/networks" and method == "GET":
+            names = json.loads(query.get("filters", ["{}"])[0]).get("name")
+            with fake.lock:
+                networks = [network for network in fake.networks if not names or network in names]
+            return self.reply(200, [{"Name": network, "Id": network} for network in networks])
+        if path == "/networks/create" and method == "POST":
+            network = json.loads(body)["Name"]
+            with fake.lock:
+                fake.networks.add(network)
+            return self.reply(201, {"Id": network, "Warning": ""})
+        if re.match(r"^/networks/[^/]+/connect$", path):
+            return self.reply(200)
+        match = re.match(r"^/containers/([^/]+)(/\w+)?$", path)
+        if match:
+            cid = fake.find(match.group(1))
+            if cid is None:
+                return self.reply(404, {"message": f"No such container: {match.group(1)}"})
+            action = match.group(2)
+            if action == "/json":
+                return self.reply(200, fake.inspect(cid))
+            if action == "/stats":
+                return self.reply(200, self.stats(cid))
+            if action in ("/start", "/stop", "/restart"):
+                fake.set_state(cid, running=action != "/stop")
+                return self.reply(204)
+            if action == "/exec":
+                return self.reply(201, {"Id": f"exec-{cid[:12]}"})
+            if action is None and method == "DELETE":
+                if query.get("force", ["false"])[0].lower() not in ("1", "true") and fake.containers[cid]["running"]:
+                    return self.reply(409, {"message": "You cannot remove a running container"})
+                fake.set_state(cid, remove=True)
+                return self.reply(204)
+        match = re.match(r"^/exec/([^/]+)/(start|json)$", path)
+        if match:
+            if match.group(2) == "json":
+                return self.reply(200, {"ExitCode": 0, "Running": False})
+            # Le client lit la sortie de l'exec jusqu'à la fermeture de la connexion
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            return
+        self.reply(404, {"message": f"page not found: {method} {path}"})
+
+    @staticmethod
+    def stats(cid):
+        seed = int(cid[:8], 16)
+        return {
+            "cpu_stats": {"cpu_usage": {"total_usage": 2000000 + seed % 1000}, "system_cpu_usage": 10 ** 9, "online_cpus": 4},
+            "precpu_stats": {"cpu_usage": {"total_usage": 1000000}, "system_cpu_usage": 10 ** 9 - 10 ** 7},
+            "memory_stats": {"usage": 50 * 2 ** 20 + seed % 2 ** 20, "limit": 2 ** 31, "stats": {"inactive_file": 0}},
+            "networks": {"eth0": {"rx_bytes": seed % 10 ** 6, "tx_bytes": seed % 10 ** 5}},
+            "blkio_stats": {"io_service_bytes_recursive": [{"op": "read", "value": 4096}, {"op": "write", "value": 8192}]},
+        }
+
+    def events(self):
+        """Flux chunked : un objet JSON par événement, jusqu'à la déconnexion du client"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.wfile.flush()
+        pending = []
+        with self.server.fake.lock:
+            self.server.fake.subscribers.append(pending)
+        try:
+            while True:
+                while pending:
+                    data = pending.pop(0) + b"\n"
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                time.sleep(0.05)
+        except OSError:
+            pass
+        finally:
+            with self.server.fake.lock:
+                self.server.fake.subscribers.remove(pending)
+
+    def do_GET(self):
+        self.route("GET")
+
+    def do_POST(self):
+        self.route("POST")
+
+    def do_DELETE(self):
+        self.route("DELETE")
+
+    def log_message(self, *args):
+        pass
+
+    def address_string(self):
+        return "unix"
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--containers", type=int, default=1000)
+    parser.add_argument("--ports", type=int, default=1, help="ports publiés par conteneur")
+    parser.add_argument("--mounts", type=int, default=1, help="montages par conteneur")
+    parser.add_argument("--networks", type=int, default=1, help="réseaux par conteneur")
+    parser.add_argument("--latency-ms", type=float, default=0, help="latence ajoutée à chaque requête")
+    parser.add_argument("--prefix", default="bench", help="préfixe des noms et des IDs générés")
+    parser.add_argument("--pull-ms", type=float, default=0, help="durée d'un téléchargement d'image")
+    parser.add_argument("--events-per-second", type=float, default=0)
+    args = parser.parse_args()
+
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    server = Server(args.socket, Handler)
+    server.fake = FakeDocker(args.containers, args.ports, args.mounts, args.networks, args.latency_ms / 1000,
+                             args.pull_ms / 1000, args.prefix)
+    if args.events_per_second:
+        threading.Thread(target=server.fake.churn, args=(args.events_per_second,), daemon=True).start()
+    print(f"ready {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Benchmark de synchronisation contre le faux daemon (benchmarks/fake_docker.py), de 1k à 10k conteneurs.
+
+Pour chaque taille, dans un répertoire de travail vide :
+  - cold     : première synchronisation (commandes inconnues, un inspect par conteneur)
+  - warm     : resynchronisations suivantes (--runs), une seule requête de listing attendue
+  - restart  : nouveau backend sur les mêmes fichiers (instantané, commandes, cache d'inspect), aucun inspect attendu
+  - tk       : avec --ui et un serveur X (Xvfb), temps de remplissage du Treeview par DockerManagerApp
+Avec --multi-host, un scénario supplémentaire configure trois hôtes : un faux daemon rapide, un faux daemon plus
+lent que le délai par hôte (--slow-ms) et un socket absent. Il vérifie le délai par hôte, l'ouverture du
+disjoncteur et la conservation des lignes des hôtes muets (code de sortie 1 si une vérification échoue).
+Chaque scénario rapporte la latence, les appels à l'API par route, la mémoire et les percentiles des phases
+mesurées par l'application. Résultat en JSON (--output ou sortie standard), comparable d'une version à l'autre.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, os.pardir, "docker-manager.py")
+
+
+def load_app():
+    # Pas de disjoncteur ni de délai qui fausse les grandes tailles; pas d'échantillonnage des stats; état hors du dépôt
+    os.environ.setdefault("DOCKER_MANAGER_HOST_TIMEOUT", "600")
+    os.environ.setdefault("DOCKER_MANAGER_STATS_INTERVAL", "0")
+    os.environ.setdefault("DOCKER_MANAGER_STATE_DIR", tempfile.mkdtemp(prefix="docker-manager-bench-state-"))
+    spec = importlib.util.spec_from_file_location("docker_manager", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextmanager
+def isolated(app, directory):
+    """Commandes (relatives au répertoire courant), instantané et caches propres au scénario"""
+    saved = {name: getattr(app, name) for name in ("SNAPSHOT_FILE", "INSPECT_CACHE_FILE", "GROUP_FILE")}
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        for name, path in saved.items():
+            setattr(app, name, os.path.join(directory, os.path.basename(path)))
+        yield
+    finally:
+        for name, path in saved.items():
+            setattr(app, name, path)
+        os.chdir(cwd)
+
+
+def fake_request(path, method, request):
+    """Requête HTTP minimale vers le faux daemon (routes /_fake/*)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(f"{method} {request} HTTP/1.0\r\nHost: fake\r\n\r\n".encode())
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    body = data.split(b"\r\n\r\n", 1)[1]
+    return json.loads(body) if body else None
+
+
+class FakeDaemon:
+    def __init__(self, directory, args, containers, name="fake-docker"):
+        self.socket = os.path.join(directory, f"{name}.sock")
+        command = [sys.executable, os.path.join(HERE, "fake_docker.py"), "--socket", self.socket,
+                   "--containers", str(containers), "--ports", str(args.ports), "--mounts", str(args.mounts),
+                   "--networks", str(args.networks), "--latency-ms", str(args.latency_ms), "--prefix", name]
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        if not self.process.stdout.readline().startswith("ready"):
+            raise RuntimeError("Le faux daemon n'a pas démarré")
+
+    def calls(self):
+        return fake_request(self.socket, "GET", "/_fake/calls")
+
+    def reset(self):
+        fake_request(self.socket, "POST", "/_fake/reset")
+
+    def set_latency(self, ms):
+        fake_request(self.socket, "POST", f"/_fake/latency?ms={ms}")
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+def phases(app):
+    """Percentiles des opérations mesurées par l'application pendant le scénario"""
+    return {name: {key: stats[key] for key in ("count", "p50_ms", "p95_ms", "p99_ms")}
+            for name, stats in app.timings.summary().items()}
+
+
+def scenario(app, daemon, name, run, count=1):
+    """Exécute run() count fois et rassemble latence, appels API et phases"""
+    daemon.reset()
+    app.timings.reset()
+    durations = []
+    for _ in range(count):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    return {"scenario": name, "runs": len(durations),
+            "latency_ms": {"median": round(statistics.median(durations) * 1000, 1),
+                           "max": round(max(durations) * 1000, 1)},
+            "api_calls": daemon.calls(), "phases": phases(app)}
+
+
+def bench_size(app, args, containers):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="docker-manager-bench-") as directory:
+        daemon = FakeDaemon(directory, args, containers)
+        try:
+            with isolated(app, directory):
+                hosts = [("bench", f"unix://{daemon.socket}")]
+                backend = app.DockerBackend(hosts)
+                backend.hosts.primary.get_client()  # Connexion hors mesure
+
+                results.append(scenario(app, daemon, "cold", backend.sync_containers))
+                results.append(scenario(app, daemon, "warm", backend.sync_containers, args.runs))
+
+                # Pic d'allocations Python d'une resynchronisation (parsing du listing + construction des lignes)
+                tracemalloc.start()
+                backend.sync_containers()
+                results[-1]["sync_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+                tracemalloc.stop()
+                backend.stop()
+
+                restarted = {}
+
+                def restart():
+                    restarted["backend"] = app.DockerBackend(hosts)
+                    restarted["backend"].sync_containers()
+
+                results.append(scenario(app, daemon, "restart", restart))
+                if args.ui:
+                    results.append(bench_tk(app, daemon, restarted["backend"]))
+                restarted["backend"].stop()
+        finally:
+            daemon.stop()
+    for result in results:
+        result["containers"] = containers
+    results[-1]["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return results
+
+
+def bench_hosts(app, args, containers):
+    """Trois hôtes dont un lent et un absent : délai par hôte, disjoncteur et lignes conservées"""
+    timeout = args.slow_ms / 1000 / 3  # Le daemon lent dépasse largement le délai accordé
+    with tempfile.TemporaryDirectory(prefix="docker-manager-bench-") as directory:
+        fast = FakeDaemon(directory, args, containers, name="fast")
+        slow = FakeDaemon(directory, args, containers, name="slow")
+        saved_timeout = app.HOST_TIMEOUT
+        try:
+            with isolated(app, directory):
+                backend = app.DockerBackend([("fast", f"unix://{fast.socket}"), ("slow", f"unix://{slow.socket}"),
+                                             ("missing", f"unix://{os.path.join(directory, 'missing.sock')}")])
+                # Premier listing sans délai : les deux faux daemons répondent et peuplent le modèle
+                backend.sync_containers()
+                hosts_seen = sorted({row[5] for row in backend.model.snapshot().values()})
+
+                slow.set_latency(args.slow_ms)  # Ralenti seulement ensuite : le premier listing et ses inspects restent rapides
+                app.HOST_TIMEOUT = timeout
+                durations = []
+                for _ in range(app.HOST_FAILURE_THRESHOLD):
+                    start = time.perf_counter()
+                    backend.sync_containers()
+                    durations.append(time.perf_counter() - start)
+                rows = backend.model.snapshot()
+                start = time.perf_counter()
+                backend.sync_containers()  # Disjoncteurs ouverts : les hôtes en échec ne sont plus interrogés
+                skipped = time.perf_counter() - start
+                errors = dict(backend.host_errors)
+                kept = {host: sum(1 for row in backend.model.snapshot().values() if row[5] == host) for host in ("fast", "slow")}
+                checks = {
+                    "all_hosts_listed_first": hosts_seen == ["fast", "slow"],
+                    "bounded_by_host_timeout": max(durations) < timeout + 1,
+                    "slow_and_missing_reported": {"slow", "missing"} <= set(errors) and "fast" not in errors,
+                    "breaker_open": not backend.hosts.get("slow").available() and not backend.hosts.get("missing").available(),
+                    "breaker_skips_hosts": skipped < timeout and errors.get("slow") == "disjoncteur ouvert",
+                    "rows_kept": kept == {"fast": containers, "slow": containers} and len(rows) == 2 * containers,
+                }
+                backend.stop()
+        finally:
+            app.HOST_TIMEOUT = saved_timeout
+            fast.stop()
+            slow.stop()
+    return {"scenario": "multi-host", "containers": containers, "host_timeout_s": round(timeout, 3),
+            "latency_ms": {"median": round(statistics.median(durations) * 1000, 1),
+                           "max": round(max(durations) * 1000, 1), "breaker_open": round(skipped * 1000, 1)},
+            "host_errors": errors, "rows_kept": kept, "checks": checks, "ok": all(checks.values())}
+
+
+def bench_tk(app, daemon, backend):
+    """Remplissage complet du Treeview à partir du modèle, mesuré jusqu'à ce que toutes les lignes soient affichées"""
+    import tkinter as tk
+    root = tk.Tk()
+    backend.snapshot_time = None  # Pas de pré-remplissage depuis l'instantané : tout passe par la mesure
+    window = app.DockerManagerApp(root, backend)
+    rows = backend.model.snapshot()
+
+    def fill():
+        backend.notify("rows", changed=rows, removed=[], complete=True)
+        while len(window.tree.get_children()) < len(rows) or window.tree_job is not None:
+            root.update()
+
+    result = scenario(app, daemon, "tk", fill)
+    window.stats_sampler.stop()
+    window.shell_cache.shutdown()
+    window.executor.shutdown()
+    root.destroy()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--containers", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--ports", type=int, default=1)
+    parser.add_argument("--mounts", type=int, default=1)
+    parser.add_argument("--networks", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0, help="latence injectée par requête du faux daemon")
+    parser.add_argument("--runs", type=int, default=5, help="resynchronisations mesurées par taille (scénario warm)")
+    parser.add_argument("--multi-host", action="store_true", help="ajoute le scénario à trois hôtes (lent, absent)")
+    parser.add_argument("--slow-ms", type=float, default=1500, help="latence du daemon lent du scénario multi-hôte")
+    parser.add_argument("--ui", action="store_true", help="mesure aussi le Treeview (nécessite DISPLAY, ex. xvfb-run)")
+    parser.add_argument("--output", help="fichier JSON de résultats (sortie standard par défaut)")
+    args = parser.parse_args()
+    if args.ui and not os.environ.get("DISPLAY"):
+        print("--ui nécessite un serveur X (xvfb-run par exemple)", file=sys.stderr)
+        return 2
+
+    app = load_app()
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                                  text=True).stdout.strip() or None
+    except OSError:
+        revision = None
+    report = {"benchmark": "refresh", "revision": revision, "python": platform.python_version(),
+              "parameters": {key: value for key, value in vars(args).items() if key != "output"}, "results": []}
+    for containers in args.containers:
+        report["results"].extend(bench_size(app, args, containers))
+    if args.multi_host:
+        report["results"].append(bench_hosts(app, args, min(args.containers)))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0 if all(result.get("ok", True) for result in report["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
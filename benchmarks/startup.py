@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Benchmark de démarrage : délai entre le lancement du processus et le premier affichage de la liste.
+
+Chaque essai lance docker-manager.py --first-paint avec un répertoire d'état isolé qui contient un instantané
+de --rows conteneurs. Le daemon configuré est injoignable : seul le chemin instantané -> fenêtre est mesuré.
+Résultat en JSON sur la sortie standard; code de sortie 1 si la médiane dépasse --target-ms.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "docker-manager.py")
+SNAPSHOT_FILE = "docker-manager-snapshot.json"
+
+
+def write_snapshot(directory, rows):
+    snapshot = {"version": 1, "saved": time.time(), "rows": {}}
+    for i in range(rows):
+        cid = f"{i:064x}"
+        running = i % 3 != 0
+        snapshot["rows"][cid] = [cid[:12], f"bench-{i:05d}", "Running" if running else "Stopped",
+                                 f"{8000 + i}->80/tcp" if running else "N/A", running, "bench", f"sha256:{i % 20:064x}"]
+    with open(os.path.join(directory, SNAPSHOT_FILE), "w") as f:
+        json.dump(snapshot, f)
+
+
+def run_once(directory):
+    env = dict(os.environ,
+               DOCKER_MANAGER_SOCKET=os.path.join(directory, "service.sock"),
+               DOCKER_MANAGER_HOSTS=f"bench=unix://{os.path.join(directory, 'absent.sock')}",
+               DOCKER_MANAGER_STATS_INTERVAL="0",
+               DOCKER_MANAGER_STATE_DIR=directory,
+               DOCKER_MANAGER_LOG_DIR=os.path.join(directory, "logs"))
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, SCRIPT, "--first-paint"], cwd=directory, env=env,
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    wall = time.perf_counter() - start
+    process.wait(timeout=30)
+    if not line.startswith("first-paint "):
+        raise RuntimeError(f"Sortie inattendue (code {process.returncode}) : {line!r}")
+    return wall, float(line.split()[1])
+
+
+def summary(values):
+    return {"median_ms": round(statistics.median(values) * 1000, 1), "max_ms": round(max(values) * 1000, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=500, help="conteneurs dans l'instantané")
+    parser.add_argument("--target-ms", type=float, default=1000, help="médiane maximale acceptée (processus complet)")
+    args = parser.parse_args()
+    if not os.environ.get("DISPLAY"):
+        print("DISPLAY absent : le benchmark a besoin d'un serveur X (xvfb-run par exemple)", file=sys.stderr)
+        return 2
+
+    walls, in_process = [], []
+    with tempfile.TemporaryDirectory(prefix="docker-manager-bench-") as directory:
+        write_snapshot(directory, args.rows)
+        for _ in range(args.runs):
+            wall, elapsed = run_once(directory)
+            walls.append(wall)
+            in_process.append(elapsed)
+
+    result = {"benchmark": "startup", "runs": args.runs, "rows": args.rows, "target_ms": args.target_ms,
+              "wall": summary(walls), "in_process": summary(in_process)}
+    result["ok"] = result["wall"]["median_ms"] <= args.target_ms
+    print(json.dumps(result, indent=2))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,2790 @@
 #!/usr/bin/env python3
 
+import argparse
+import atexit
+import codecs
+import fcntl
+import functools
+import hashlib
+import importlib.util
 import json
 import logging
+import logging.handlers
+import math
 import os
+import queue
+import re
+import shlex
+import signal
+import socket
+import socketserver
+import struct
 import subprocess
 import sys
+import tempfile
 import threading
+import time
 import tkinter as tk
-from tkinter import ttk
+import urllib.parse
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
+from tkinter import messagebox, simpledialog, ttk
+
+STARTED = time.perf_counter()  # Référence du délai de premier affichage
+
+
+class LazyModule:
+    """Module réellement importé au premier accès à l'un de ses attributs. L'import a lieu une seule fois, sous
+    verrou : LazyLoader n'est pas sûr quand plusieurs threads (listings par hôte, flux d'événements) y accèdent."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attribute):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return getattr(module, attribute)
+
+
+def lazy_import(name):
+    """Module chargé au premier usage; son absence est signalée dès le démarrage"""
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"Module '{name}' introuvable : installez-le (pip install {name}) ou, pour un binaire "
+                          f"PyInstaller, ajoutez --hidden-import {name}")
+    return LazyModule(name)
+
+
+# Le SDK Docker coûte ~150 ms à l'import : chargé seulement quand un daemon est contacté ou une erreur examinée
+docker = lazy_import("docker")
+
+# État local hors du répertoire courant : instantané, caches et journaux ne dépendent pas du lieu de lancement
+STATE_DIR = os.path.expanduser(os.environ.get(
+    "DOCKER_MANAGER_STATE_DIR", os.path.join(os.environ.get("XDG_STATE_HOME", "~/.local/state"), "docker-manager")))
+# Journaux : log technique à rotation et journal des opérations
+LOG_DIR = os.path.expanduser(os.environ.get("DOCKER_MANAGER_LOG_DIR", STATE_DIR))
+LOG_FILE = os.path.join(LOG_DIR, "docker-manager.log")
+LOG_MAX_BYTES = 5 * 2 ** 20  # Taille à partir de laquelle le log technique est renouvelé
+LOG_BACKUPS = 3  # Anciens fichiers de log gardés
+JOURNAL_FILE = os.path.join(LOG_DIR, "operations.jsonl")
+JOURNAL_INDEX_DEPTH = 200  # Dernières opérations indexées par conteneur
+COMMAND_FILE = "container-commands.json"
+INSPECT_CACHE_FILE = os.path.join(STATE_DIR, "inspect-cache.json")
+INSPECT_CACHE_SIZE = 5000  # Nombre maximum d'entrées gardées dans le cache d'inspect (LRU)
+SNAPSHOT_FILE = os.path.join(STATE_DIR, "docker-manager-snapshot.json")  # Dernière liste connue, affichée dès le démarrage
+GROUP_FILE = os.path.join(STATE_DIR, "container-groups.json")  # Groupes nommés de commandes lancées ensemble
+# Socket unix du service partagé par l'interface, les autres invocations et les scripts. Le service lance des
+# commandes shell : il vit dans un répertoire privé (XDG_RUNTIME_DIR, sinon un répertoire 0700 de l'utilisateur)
+SERVICE_DIR = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/docker-manager-{os.getuid()}"
+SERVICE_SOCKET = os.environ.get("DOCKER_MANAGER_SOCKET", os.path.join(SERVICE_DIR, "docker-manager.sock"))
+LOCK_FILE = SERVICE_SOCKET + ".lock"  # Verrou (flock) tenu par le processus qui héberge le service
+SERVICE_QUEUE_SIZE = 10000  # Notifications en attente au-delà desquelles un abonné trop lent est déconnecté
+SERVICE_CONNECT_TIMEOUT = 5  # Secondes d'attente du socket d'un service qui démarre
+TIMING_WINDOW = 1000  # Dernières mesures gardées par opération pour les percentiles
+PERF_REFRESH_MS = 1000  # Intervalle de rafraîchissement de la fenêtre des performances
+METRICS_FILE = os.path.join(STATE_DIR, "docker-manager-metrics")  # Préfixe des exports (.json, .prom)
+# Daemons gérés : "nom=url,nom=url" (unix:///chemin.sock ou tcp://hôte:port); vide = docker.from_env()
+DOCKER_HOSTS = os.environ.get("DOCKER_MANAGER_HOSTS", "")
+HOST_TIMEOUT = float(os.environ.get("DOCKER_MANAGER_HOST_TIMEOUT", "5"))  # Secondes accordées à chaque hôte pour le listing
+HOST_FAILURE_THRESHOLD = 3  # Échecs consécutifs avant d'ouvrir le disjoncteur d'un hôte
+HOST_COOLDOWN = 30  # Secondes pendant lesquelles un hôte au disjoncteur ouvert est ignoré
+ACTION_WORKERS = int(os.environ.get("DOCKER_MANAGER_WORKERS", "8"))  # Opérations Docker simultanées maximum
+PULL_WORKERS = int(os.environ.get("DOCKER_MANAGER_PULL_WORKERS", "3"))  # Téléchargements d'images simultanés maximum
+BUILTIN_NETWORKS = {"bridge", "host", "none", "default"}  # Réseaux fournis par le daemon, jamais créés
+DISK_USAGE_TTL = float(os.environ.get("DOCKER_MANAGER_DISK_USAGE_TTL", "120"))  # Secondes de validité d'un /system/df
+TREE_CHUNK_SIZE = 200  # Nombre maximum de lignes du Treeview traitées par tick Tk
+COMMANDS_FLUSH_DELAY = 0.5  # Secondes pendant lesquelles les modifications de commandes sont regroupées
+STATS_INTERVAL = float(os.environ.get("DOCKER_MANAGER_STATS_INTERVAL", "5"))  # Secondes entre deux échantillons (0 = désactivé)
+STATS_WORKERS = 4  # Requêtes /stats simultanées maximum
+SHELL_PREWARM_WORKERS = 2  # Détections de shell anticipées simultanées, hors du pool des actions
+STATS_IDLE_CPU = 0.5  # En dessous de ce % CPU, un conteneur est considéré inactif...
+STATS_IDLE_SKIP = 3  # ...et n'est rééchantillonné qu'un tick sur STATS_IDLE_SKIP + 1
+LOG_BUFFER_LINES = 5000  # Lignes gardées par fenêtre de logs (tampon circulaire)
+LOG_TAIL = 1000  # Lignes d'historique chargées à l'ouverture d'une fenêtre de logs
+LOG_FRAME_MS = 50  # Intervalle d'ajout des lignes reçues dans la fenêtre de logs
+RESYNC_DELAY = 2  # Secondes d'attente avant de se réabonner au flux d'événements
+# Actions du flux d'événements qui modifient une ligne de la liste (exec_*, health_status, attach... sont ignorés)
+CONTAINER_EVENT_ACTIONS = {"create", "start", "restart", "stop", "die", "kill", "pause", "unpause", "rename", "update", "destroy"}
+
+
+def setup_logging():
+    """Log non bloquant : les threads déposent les enregistrements dans une file, un seul thread écrit
+    dans un fichier renouvelé par taille"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                   encoding="utf-8")
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, handler)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    listener.start()
+    atexit.register(listener.stop)  # Vide la file avant la sortie
+
+
+def write_json_atomic(path, data):
+    """Écrit un fichier JSON via un fichier temporaire + rename : un crash laisse l'ancien fichier intact"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".docker-manager-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_json(path, default):
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        logging.error(f"Erreur lors du chargement de {path}: {e}")
+    return default
+
+
+def format_ports(ports):
+    """Formate la liste Ports du résumé /containers/json en 'hôte->conteneur'"""
+    port_list = [f"{port['PublicPort']}->{port['PrivatePort']}/{port.get('Type', 'tcp')}"
+                 for port in ports or [] if port.get('PublicPort')]
+    return ", ".join(port_list) if port_list else "N/A"
+
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def stats_values(sample, previous):
+    """Colonnes CPU, mémoire, réseau et disque d'un échantillon /stats one-shot.
+    Le % CPU est calculé par rapport à l'échantillon précédent (cpu_total, system_total) du même conteneur."""
+    cpu_stats = sample.get('cpu_stats', {})
+    cpu_total = cpu_stats.get('cpu_usage', {}).get('total_usage', 0)
+    system_total = cpu_stats.get('system_cpu_usage', 0)
+    cpu_percent = None
+    if previous and system_total > previous[1]:
+        online_cpus = cpu_stats.get('online_cpus') or len(cpu_stats.get('cpu_usage', {}).get('percpu_usage') or [1])
+        cpu_percent = (cpu_total - previous[0]) / (system_total - previous[1]) * online_cpus * 100
+
+    memory = sample.get('memory_stats', {})
+    memory_details = memory.get('stats', {})
+    # Comme 'docker stats' : le cache de pages n'est pas compté (cgroup v2 puis v1)
+    memory_usage = memory.get('usage', 0) - memory_details.get('inactive_file', memory_details.get('cache', 0))
+    network_rx = sum(network.get('rx_bytes', 0) for network in (sample.get('networks') or {}).values())
+    network_tx = sum(network.get('tx_bytes', 0) for network in (sample.get('networks') or {}).values())
+    block_read = block_write = 0
+    for entry in sample.get('blkio_stats', {}).get('io_service_bytes_recursive') or []:
+        if entry.get('op', '').lower() == 'read':
+            block_read += entry.get('value', 0)
+        elif entry.get('op', '').lower() == 'write':
+            block_write += entry.get('value', 0)
+
+    return ("..." if cpu_percent is None else f"{cpu_percent:.1f}%",
+            format_bytes(max(memory_usage, 0)),
+            f"{format_bytes(network_rx)} / {format_bytes(network_tx)}",
+            f"{format_bytes(block_read)} / {format_bytes(block_write)}"), (cpu_total, system_total), cpu_percent
+
+
+# Options de 'docker run' suivies d'une valeur, avec le champ structuré qui la reçoit
+RUN_VALUE_OPTIONS = {
+    "--name": "name", "-p": "ports", "--publish": "ports", "-v": "mounts", "--volume": "mounts",
+    "--network": "networks", "--net": "networks", "-e": "env", "--env": "env",
+}
+# Autres options de 'docker run' qui prennent une valeur, gardées telles quelles dans 'options'
+RUN_OTHER_VALUE_OPTIONS = {
+    "-a", "--attach", "--add-host", "--annotation", "--blkio-weight", "--blkio-weight-device", "--cap-add",
+    "--cap-drop", "--cgroup-parent", "--cgroupns", "--cidfile", "-c", "--cpu-shares", "--cpu-count",
+    "--cpu-percent", "--cpu-period", "--cpu-quota", "--cpu-rt-period", "--cpu-rt-runtime", "--cpus",
+    "--cpuset-cpus", "--cpuset-mems", "--detach-keys", "--device", "--device-cgroup-rule", "--device-read-bps",
+    "--device-read-iops", "--device-write-bps", "--device-write-iops", "--dns", "--dns-option", "--dns-opt",
+    "--dns-search", "--domainname", "--entrypoint", "--env-file", "--expose", "--gpus", "--group-add",
+    "--health-cmd", "--health-interval", "--health-retries", "--health-start-period", "--health-start-interval",
+    "--health-timeout", "-h", "--hostname", "--io-maxbandwidth", "--io-maxiops", "--ip", "--ip6", "--ipc",
+    "--isolation", "--kernel-memory", "-l", "--label", "--label-file", "--link", "--link-local-ip", "--log-driver",
+    "--log-opt", "--mac-address", "-m", "--memory", "--memory-reservation", "--memory-swap", "--memory-swappiness",
+    "--mount", "--network-alias", "--net-alias", "--oom-score-adj", "--pid", "--pids-limit", "--platform", "--pull",
+    "--restart", "--runtime", "--security-opt", "--shm-size", "--stop-signal", "--stop-timeout", "--storage-opt",
+    "--sysctl", "--tmpfs", "--ulimit", "-u", "--user", "--userns", "--uts", "--volume-driver", "--volumes-from",
+    "-w", "--workdir",
+}
+# Options booléennes de 'docker run'; les options courtes peuvent être groupées (-dit)
+RUN_FLAG_OPTIONS = {
+    "-d", "--detach", "-i", "--interactive", "-t", "--tty", "--rm", "--privileged", "--init", "--read-only", "-P",
+    "--publish-all", "--no-healthcheck", "--oom-kill-disable", "--sig-proxy", "--disable-content-trust", "-q",
+    "--quiet", "--use-api-socket",
+}
+
+
+def parse_run_command(cmd):
+    """Découpe une ligne 'docker run' (shlex) en enregistrement structuré :
+    image, name, ports, mounts, networks, env, options (autres options, dans l'ordre) et cmd.
+    Une ligne qui n'est pas 'docker run ...' ou qui contient une option inconnue est marquée 'unparsed'."""
+    try:
+        parts = shlex.split(cmd)
+    except ValueError:
+        parts = cmd.split()
+    record = {"image": "", "name": "", "ports": [], "mounts": [], "networks": [], "env": [], "options": [], "cmd": []}
+    if parts[:2] != ["docker", "run"]:
+        # Autre commande (sudo, docker compose, script...) : rien à traduire, elle reste au shell telle quelle
+        record["unparsed"] = True
+        record["cmd"] = parts
+        return record
+    i = 2
+    while i < len(parts):
+        part = parts[i]
+        option, _, inline_value = part.partition("=") if part.startswith("--") else (part, "", "")
+        if not part.startswith("-"):
+            # Premier argument positionnel : l'image, la suite est la commande du conteneur
+            record["image"] = part
+            record["cmd"] = parts[i + 1:]
+            break
+        if option in RUN_VALUE_OPTIONS or option in RUN_OTHER_VALUE_OPTIONS:
+            if inline_value:
+                value = inline_value
+            elif i + 1 < len(parts):
+                i += 1
+                value = parts[i]
+            else:
+                value = ""
+            field = RUN_VALUE_OPTIONS.get(option)
+            if field == "name":
+                record["name"] = value
+            elif field:
+                record[field].append(value)
+            else:
+                record["options"].append([option, value])
+        elif option in RUN_FLAG_OPTIONS or (len(part) > 1 and part[1] != "-" and all(f"-{flag}" in RUN_FLAG_OPTIONS for flag in part[1:])):
+            record["options"].append([part, None])  # Option booléenne (--rm, -d, -it, --sig-proxy=false...)
+        else:
+            # Option inconnue : impossible de savoir si elle prend une valeur, donc où commence l'image. Le reste
+            # est gardé brut dans 'cmd' (empreinte distincte) et la commande passera par la CLI.
+            record["unparsed"] = True
+            record["cmd"] = parts[i:]
+            break
+        i += 1
+    return record
+
+
+def command_fingerprint(record):
+    """Empreinte canonique : l'ordre des -p, -v, -e, --network et des autres options n'y compte pas"""
+    canonical = {
+        "image": record["image"], "name": record["name"], "cmd": record["cmd"],
+        "ports": sorted(record["ports"]), "mounts": sorted(record["mounts"]),
+        "networks": sorted(record["networks"]), "env": sorted(record["env"]),
+        "options": sorted(record["options"], key=lambda option: (option[0], option[1] or "")),
+    }
+    return hashlib.sha1(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+# Options booléennes de 'docker run' et argument correspondant de client.containers.create()
+RUN_FLAG_KWARGS = {
+    "--rm": "auto_remove", "-i": "stdin_open", "--interactive": "stdin_open", "-t": "tty", "--tty": "tty",
+    "--privileged": "privileged", "--init": "init", "--read-only": "read_only", "-P": "publish_all_ports",
+    "--publish-all": "publish_all_ports",
+}
+RUN_VALUE_KWARGS = {
+    "-w": "working_dir", "--workdir": "working_dir", "-u": "user", "--user": "user", "-h": "hostname",
+    "--hostname": "hostname", "--entrypoint": "entrypoint", "-m": "mem_limit", "--memory": "mem_limit",
+    "--shm-size": "shm_size", "--platform": "platform", "--stop-signal": "stop_signal", "--pid": "pid_mode",
+    "--ipc": "ipc_mode",
+}
+RUN_LIST_KWARGS = {"--cap-add": "cap_add", "--cap-drop": "cap_drop", "--dns": "dns", "--device": "devices", "--tmpfs": "tmpfs",
+                   "--volumes-from": "volumes_from"}
+SHELL_OPERATORS = {"&&", "||", ";", "|", "&", ">", ">>", "<", "2>", "2>&1"}
+
+
+def run_spec(record):
+    """Traduit un enregistrement 'docker run' en (image, commande, kwargs de containers.create, réseaux à connecter).
+    Lève ValueError pour ce que le traducteur ne sait pas reproduire : la CLI sert alors de repli."""
+    kwargs = {}  # create + start : le conteneur est toujours détaché, -d n'a rien à traduire
+    for option, value in record["options"]:
+        if option in ("-d", "--detach"):
+            continue
+        if value is None and len(option) > 2 and option[0] == "-" and option[1] != "-":
+            flags = [f"-{flag}" for flag in option[1:]]  # Options courtes groupées : -it, -dit...
+        else:
+            flags = [option]
+        for flag in flags:
+            if flag in ("-d", "--detach"):
+                continue
+            if value is None and flag in RUN_FLAG_KWARGS:
+                kwargs[RUN_FLAG_KWARGS[flag]] = True
+            elif value is not None and flag in RUN_VALUE_KWARGS:
+                kwargs[RUN_VALUE_KWARGS[flag]] = value
+            elif value is not None and flag in RUN_LIST_KWARGS:
+                kwargs.setdefault(RUN_LIST_KWARGS[flag], []).append(value)
+            elif value is not None and flag in ("-l", "--label"):
+                label, _, label_value = value.partition("=")
+                kwargs.setdefault("labels", {})[label] = label_value
+            elif value is not None and flag == "--link":
+                name, _, alias = value.partition(":")
+                kwargs.setdefault("links", {})[name] = alias or name
+            elif value is not None and flag == "--add-host":
+                host, _, address = value.partition(":")
+                kwargs.setdefault("extra_hosts", {})[host] = address
+            elif value is not None and flag == "--restart":
+                policy, _, retries = value.partition(":")
+                kwargs["restart_policy"] = {"Name": policy, "MaximumRetryCount": int(retries or 0)}
+            else:
+                raise ValueError(f"option non supportée: {flag}")
+
+    ports = {}
+    for mapping in record["ports"]:
+        spec, _, protocol = mapping.partition("/")
+        fields = spec.rsplit(":", 2)
+        if any("-" in field for field in fields):
+            raise ValueError(f"plage de ports non supportée: {mapping}")
+        container_port = f"{fields[-1]}/{protocol or 'tcp'}"
+        if len(fields) == 1:
+            binding = None
+        elif len(fields) == 2:
+            binding = int(fields[0])
+        else:
+            binding = (fields[0], int(fields[1])) if fields[1] else (fields[0],)
+        ports.setdefault(container_port, []).append(binding)
+    if ports:
+        kwargs["ports"] = {port: bindings[0] if len(bindings) == 1 else bindings for port, bindings in ports.items()}
+    if record["mounts"]:
+        kwargs["volumes"] = list(record["mounts"])
+    environment = []
+    for variable in record["env"]:
+        if "=" in variable:
+            environment.append(variable)
+        elif variable in os.environ:
+            environment.append(f"{variable}={os.environ[variable]}")  # '-e VAR' reprend la valeur locale, comme la CLI
+    if environment:
+        kwargs["environment"] = environment
+    if record["name"]:
+        kwargs["name"] = record["name"]
+    if record["networks"]:
+        kwargs["network"] = record["networks"][0]
+    # La commande était interprétée par /bin/sh via shell=True : opérateurs et expansions restent à la CLI
+    for part in record["cmd"]:
+        if part in SHELL_OPERATORS or "$" in part or "`" in part:
+            raise ValueError(f"syntaxe shell dans la commande: {part}")
+    if record.get("unparsed"):
+        raise ValueError(f"commande non traduite à partir de: {' '.join(record['cmd'][:1])}")
+    if not record["image"]:
+        raise ValueError("image manquante")
+    return record["image"], record["cmd"] or None, kwargs, record["networks"][1:]
+
+
+def command_dependencies(record):
+    """Noms des conteneurs dont la commande dépend (--link, --volumes-from, --network/--pid/--ipc container:<nom>)"""
+    names = set()
+    for option, value in record["options"]:
+        if option in ("--link", "--volumes-from") and value:
+            names.add(value.split(":")[0])
+        elif option in ("--pid", "--ipc") and value and value.startswith("container:"):
+            names.add(value.split(":", 1)[1])
+    for network in record["networks"]:
+        if network.startswith("container:"):
+            names.add(network.split(":", 1)[1])
+    return names
+
+
+def command_networks(record):
+    """Réseaux utilisateur à créer avant de lancer la commande"""
+    return [network for network in record["networks"]
+            if network not in BUILTIN_NETWORKS and not network.startswith("container:")]
+
+
+def launch_waves(records):
+    """Ordonne les commandes d'un groupe en vagues : chaque vague ne dépend que des précédentes et se lance en
+    parallèle. Les dépendances vers des conteneurs hors du groupe sont ignorées; un cycle lève ValueError."""
+    by_name = {record["name"]: key for key, record in records.items() if record["name"]}
+    pending = {key: {by_name[name] for name in command_dependencies(record) if name in by_name} - {key}
+               for key, record in records.items()}
+    waves = []
+    while pending:
+        wave = sorted(key for key, dependencies in pending.items() if not dependencies)
+        if not wave:
+            raise ValueError("Dépendances circulaires entre : " + ", ".join(records[key]["name"] or key for key in pending))
+        waves.append(wave)
+        for key in wave:
+            del pending[key]
+        for dependencies in pending.values():
+            dependencies.difference_update(wave)
+    return waves
+
+
+def disk_usage_rows(df, host):
+    """Lignes de la vue des ressources à partir d'un /system/df : images, conteneurs arrêtés et volumes.
+    'reclaimable' est l'espace libéré par leur suppression (couches partagées exclues pour les images)."""
+    rows = []
+    for image in df.get("Images") or []:
+        tags = [tag for tag in image.get("RepoTags") or [] if tag != "<none>:<none>"]
+        used = image.get("Containers", -1) > 0
+        size = image.get("Size", 0)
+        rows.append({"kind": "image", "id": image["Id"], "name": tags[0] if tags else "<none>", "host": host,
+                     "detail": "utilisée" if used else ("orpheline" if not tags else "inutilisée"),
+                     "size": size, "reclaimable": 0 if used else size - max(image.get("SharedSize", 0), 0)})
+    for container in df.get("Containers") or []:
+        if container.get("State") == "running":
+            continue  # Seuls les conteneurs arrêtés occupent de la place récupérable
+        names = container.get("Names") or [f"/{container['Id'][:12]}"]
+        size = container.get("SizeRw") or 0
+        rows.append({"kind": "container", "id": container["Id"], "name": names[0].lstrip("/"), "host": host,
+                     "detail": f"{container.get('State', '')} - {container.get('Image', '')}",
+                     "size": size, "reclaimable": size})
+    for volume in df.get("Volumes") or []:
+        usage = volume.get("UsageData") or {}
+        size = max(usage.get("Size", -1), 0)
+        orphan = usage.get("RefCount", 0) == 0
+        rows.append({"kind": "volume", "id": volume["Name"], "name": volume["Name"], "host": host,
+                     "detail": "orphelin" if orphan else f"utilisé par {usage.get('RefCount')} conteneur(s)",
+                     "size": size, "reclaimable": size if orphan else 0})
+    return rows
+
+
+def command_search_text(key, record):
+    """Texte indexé par le filtre du panneau de commandes : ID, nom, image et réseaux, en minuscules"""
+    return " ".join([key, record["name"], record["image"], *record["networks"]]).lower()
+
+
+def summary_row(summary, host):
+    """Construit la ligne du Treeview à partir du résumé /containers/json, sans inspect"""
+    cid = summary['Id']
+    names = summary.get('Names') or [f"/{cid[:12]}"]
+    status = "Running" if summary.get('State') == "running" else "Stopped"
+    return (cid[:12], names[0].lstrip('/'), status, format_ports(summary.get('Ports')), status == "Running", host,
+            summary.get('ImageID', ''))
+
+
+def parse_docker_hosts(spec):
+    """Liste (nom, url) des daemons configurés; url None désigne docker.from_env()"""
+    hosts = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, url = entry.partition("=") if "=" in entry.split("://")[0] else ("", "", entry)
+        hosts.append((name or url.split("://")[-1], url))
+    return hosts or [("local", None)]
+
+
+def inspect_entry(container_info):
+    """Reconstruit la ligne 'docker run' et garde les champs de l'inspect utiles au cache"""
+    config = container_info.get('Config', {})
+    host_config = container_info.get('HostConfig', {})
+    network_settings = container_info.get('NetworkSettings', {})
+    name = container_info.get('Name', '').lstrip('/')
+    image = config.get('Image', '')
+    cmd = config.get('Cmd', [])
+
+    command_parts = ["docker", "run"]
+    if host_config.get('AutoRemove', False):
+        command_parts.append("--rm")
+    if name:
+        command_parts.append(f"--name {name}")
+    ports = network_settings.get('Ports', {}) or host_config.get('PortBindings', {})
+    for container_port, host_bindings in ports.items():
+        if host_bindings:
+            for binding in host_bindings:
+                host_ip = binding.get('HostIp', '')
+                host_port = binding.get('HostPort', '')
+                port_proto = container_port.split('/')
+                container_port_num = port_proto[0]
+                if host_ip and host_port:
+                    port_mapping = f"{host_ip}:{host_port}:{container_port_num}"
+                elif host_port:
+                    port_mapping = f"{host_port}:{container_port_num}"
+                else:
+                    port_mapping = container_port_num
+                command_parts.append(f"-p {port_mapping}")
+    mounts = host_config.get('Binds', []) or []
+    for mount in mounts:
+        if mount:
+            command_parts.append(f"-v {mount}")
+    networks = network_settings.get('Networks', {})
+    for network_name in networks.keys():
+        if network_name != "bridge":
+            command_parts.append(f"--network {network_name}")
+    command_parts.append(image)
+    if cmd:
+        command_parts.append(" ".join(cmd))
+    return {
+        "command": " ".join(command_parts).strip(),
+        "name": name,
+        "image": image,
+        "networks": [network_name for network_name in networks if network_name != "bridge"],
+    }
+
+
+class Timings:
+    """Histogrammes glissants des durées par opération (TIMING_WINDOW dernières mesures), alimentés par tous les threads"""
+
+    QUANTILES = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+
+    def __init__(self, window=TIMING_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}  # Opération -> deque des dernières durées (s)
+        self.totals = {}  # Opération -> [nombre, somme des durées] depuis le démarrage
+
+    def record(self, name, seconds):
+        with self.lock:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+                self.totals[name] = [0, 0.0]
+            self.samples[name].append(seconds)
+            totals = self.totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """Décorateur : chronomètre chaque appel de la fonction"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.measure(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def summary(self):
+        """{opération: {count, sum_s, p50_ms, p95_ms, p99_ms, max_ms}}, triée par nom"""
+        with self.lock:
+            data = {name: (sorted(samples), *self.totals[name]) for name, samples in self.samples.items()}
+        result = {}
+        for name, (samples, count, total) in sorted(data.items()):
+            stats = {"count": count, "sum_s": round(total, 6)}
+            for label, q in self.QUANTILES:
+                # Rang le plus proche : pas d'interpolation, la valeur rapportée a réellement été mesurée
+                stats[f"{label}_ms"] = round(samples[max(0, math.ceil(q * len(samples)) - 1)] * 1000, 3)
+            stats["max_ms"] = round(samples[-1] * 1000, 3)
+            result[name] = stats
+        return result
+
+    def prometheus(self):
+        """Export au format texte Prometheus (type summary)"""
+        lines = ["# HELP docker_manager_operation_seconds Operation durations (quantiles over the last samples)",
+                 "# TYPE docker_manager_operation_seconds summary"]
+        for name, stats in self.summary().items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for key, q in self.QUANTILES:
+                lines.append(f'docker_manager_operation_seconds{{operation="{label}",quantile="{q}"}} {stats[key + "_ms"] / 1000:.6f}')
+            lines.append(f'docker_manager_operation_seconds_sum{{operation="{label}"}} {stats["sum_s"]:.6f}')
+            lines.append(f'docker_manager_operation_seconds_count{{operation="{label}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+timings = Timings()
+
+# Segment variable des chemins de l'API Engine (ID ou nom), remplacé pour regrouper les mesures par route
+API_PATH_ARGUMENT = re.compile(r"^(/(?:containers|exec|images|networks|volumes)/)(?!json$|create$|prune$)[^/]+")
+
+
+def instrument_api(api):
+    """Chronomètre chaque requête HTTP d'un client Docker (jusqu'aux en-têtes pour les flux)"""
+    request = api.request
+
+    def timed_request(method, url, *args, **kwargs):
+        path = API_PATH_ARGUMENT.sub(r"\1{id}", re.sub(r"^/v[\d.]+", "", urllib.parse.urlsplit(url).path))
+        with timings.measure(f"docker {method} {path}"):
+            return request(method, url, *args, **kwargs)
+
+    api.request = timed_request  # Attribut d'instance : prioritaire sur requests.Session.request
+
+
+class OperationJournal:
+    """Journal des opérations en ajout seul (une ligne JSON par opération), écrit par un thread dédié.
+    L'index garde la position des dernières entrées par clé ("*", ID du conteneur, "name:<nom>") : l'historique
+    d'un conteneur se relit par accès direct, sans parcourir le fichier."""
+
+    def __init__(self, path, depth=JOURNAL_INDEX_DEPTH):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.depth = depth
+        self.lock = threading.Lock()
+        self.index = {}  # Clé -> deque des positions des dernières entrées
+        self.size = 0  # Taille du fichier couverte par l'index
+        self.queue = queue.SimpleQueue()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.__load_index()
+        self.writer = threading.Thread(target=self.__write, daemon=True)
+        self.writer.start()
+
+    @staticmethod
+    def keys(entry):
+        keys = ["*"]
+        if entry.get("container"):
+            keys.append(entry["container"])
+        if entry.get("name"):
+            keys.append(f"name:{entry['name']}")
+        return keys
+
+    def __add(self, entry, offset):
+        for key in self.keys(entry):
+            if key not in self.index:
+                self.index[key] = deque(maxlen=self.depth)
+            self.index[key].append(offset)
+
+    def __load_index(self):
+        """Reprend l'index enregistré et n'indexe que les entrées écrites après lui"""
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        data = load_json(self.index_path, {})
+        indexed = data.get("size", 0)
+        if indexed > size:
+            indexed = 0  # Fichier remplacé depuis : index à reconstruire
+        else:
+            for key, offsets in data.get("keys", {}).items():
+                self.index[key] = deque(offsets, maxlen=self.depth)
+        if indexed < size:
+            with open(self.path, "rb") as f:
+                f.seek(indexed)
+                offset = indexed
+                for line in f:
+                    try:
+                        self.__add(json.loads(line), offset)
+                    except ValueError:
+                        pass  # Ligne tronquée par un arrêt brutal
+                    offset += len(line)
+        self.size = size
+
+    @contextmanager
+    def operation(self, op, **fields):
+        """Chronomètre une opération et l'ajoute au journal avec son résultat (l'exception est propagée)"""
+        entry = {"time": round(time.time(), 3), "op": op, **fields}
+        start = time.perf_counter()
+        try:
+            yield entry
+            entry["outcome"] = "ok"
+        except Exception as e:
+            entry["outcome"] = "error"
+            entry["error"] = str(e)
+            raise
+        finally:
+            entry["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            self.queue.put(entry)
+
+    def __write(self):
+        with open(self.path, "ab") as f:
+            while True:
+                batch = [self.queue.get()]
+                while not self.queue.empty():
+                    batch.append(self.queue.get())
+                written = []
+                for entry in batch:
+                    if entry is None:
+                        continue
+                    written.append((entry, f.tell()))
+                    f.write(json.dumps(entry, ensure_ascii=False).encode() + b"\n")
+                f.flush()
+                # Indexé seulement une fois écrit : une lecture ne tombe jamais sur une entrée incomplète
+                with self.lock:
+                    for entry, offset in written:
+                        self.__add(entry, offset)
+                    self.size = f.tell()
+                if None in batch:
+                    return
+
+    def history(self, key="*", limit=50):
+        """Dernières opérations pour une clé, de la plus récente à la plus ancienne"""
+        with self.lock:
+            offsets = list(self.index.get(key, ()))[-limit:]
+        entries = []
+        with open(self.path, "rb") as f:
+            for offset in reversed(offsets):
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+        return entries
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join(timeout=5)
+        with self.lock:
+            data = {"size": self.size, "keys": {key: list(offsets) for key, offsets in self.index.items()}}
+        try:
+            write_json_atomic(self.index_path, data)
+        except Exception as e:
+            logging.error(f"Erreur lors de la sauvegarde de l'index du journal: {e}")
+
+
+class ContainerModel:
+    """Modèle en mémoire des conteneurs, indexé par ID complet"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.generation = 0  # Incrémentée à chaque listing démarré et à chaque événement appliqué
+        self.synced_generation = 0  # Génération du dernier listing complet appliqué
+        self.touched = {}  # ID -> génération du dernier événement appliqué (suppressions comprises)
+
+    def begin_sync(self):
+        """Réserve la génération d'un listing complet, à appeler juste avant la requête"""
+        with self.lock:
+            self.generation += 1
+            return self.generation
+
+    def replace_all(self, rows, generation, hosts=None):
+        """Applique un listing complet et retourne (lignes modifiées, IDs disparus), ou None s'il est périmé.
+        Si `hosts` est donné, seules les lignes de ces hôtes sont remplacées : celles des autres sont gardées."""
+        with self.lock:
+            if generation <= self.synced_generation:
+                return None  # Un listing démarré plus tard a déjà été appliqué
+            rows = dict(rows)
+            if hosts is not None:
+                for cid, row in self.rows.items():
+                    if row[5] not in hosts:
+                        rows.setdefault(cid, row)
+            # Les événements appliqués pendant le listing sont plus récents que lui
+            for cid, stamp in self.touched.items():
+                if stamp > generation:
+                    if cid in self.rows:
+                        rows[cid] = self.rows[cid]
+                    else:
+                        rows.pop(cid, None)
+            self.touched = {cid: stamp for cid, stamp in self.touched.items() if stamp > generation}
+            changed = {cid: row for cid, row in rows.items() if self.rows.get(cid) != row}
+            removed = [cid for cid in self.rows if cid not in rows]
+            self.rows = rows
+            self.synced_generation = generation
+        return changed, removed
+
+    def upsert(self, cid, row):
+        """Insère ou met à jour une ligne, retourne True si elle a changé"""
+        with self.lock:
+            self.generation += 1
+            self.touched[cid] = self.generation
+            if self.rows.get(cid) == row:
+                return False
+            self.rows[cid] = row
+            return True
+
+    def remove(self, cid):
+        with self.lock:
+            self.generation += 1
+            self.touched[cid] = self.generation
+            return self.rows.pop(cid, None) is not None
+
+    def get(self, cid):
+        with self.lock:
+            return self.rows.get(cid)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.rows)
+
+    def load(self, rows):
+        """Amorce le modèle avec des lignes d'un instantané; la première synchronisation les réconcilie"""
+        with self.lock:
+            self.rows = dict(rows)
+
+    def running_ids(self):
+        with self.lock:
+            return [cid for cid, row in self.rows.items() if row[4]]
+
+    def sorted_ids(self):
+        """IDs triés par nom de conteneur, dans l'ordre d'affichage"""
+        with self.lock:
+            return sorted(self.rows, key=lambda cid: (self.rows[cid][1], self.rows[cid][5]))
+
+
+class RefreshScheduler:
+    """Une seule resynchronisation en cours et au plus une en attente : les demandes rapprochées sont fusionnées"""
+
+    def __init__(self, refresh, on_error):
+        self.refresh = refresh
+        self.on_error = on_error
+        self.lock = threading.Lock()
+        self.running = False
+        self.pending = False
+
+    def request(self):
+        with self.lock:
+            if self.running:
+                self.pending = True  # Sera servie par la boucle du thread en cours
+                return
+            self.running = True
+        threading.Thread(target=self.__run, daemon=True).start()
+
+    def __run(self):
+        while True:
+            with self.lock:
+                self.pending = False
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"Container list refresh failed: {e}")
+                self.on_error(e)
+            with self.lock:
+                if not self.pending:
+                    self.running = False
+                    return
 
-import docker
-from ttkthemes import ThemedTk
 
-logging.basicConfig(filename='docker-manager.log', level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+class ActionExecutor:
+    """Exécute les opérations sur les conteneurs dans un pool de threads borné, hors du thread Tk"""
 
-COMMAND_FILE = "container-commands.json"
-LOCK_FILE = "/tmp/docker_manager.lock"  # Fichier de verrouillage pour le singleton
+    def __init__(self, root, max_workers=ACTION_WORKERS):
+        self.root = root
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docker-action")
+
+    def run_bulk(self, tasks, on_progress, on_done):
+        """Lance les (clé, fonction) en parallèle; on_progress(clé, erreur) et on_done(résultats) sont appelés dans le thread Tk"""
+        lock = threading.Lock()
+        results = {}
+
+        def finished(key, future):
+            error = future.exception()
+            with lock:
+                results[key] = error
+                last = len(results) == len(tasks)
+            self.root.after(0, on_progress, key, error)
+            if last:
+                self.root.after(0, on_done, dict(results))
+
+        for key, fn in tasks:
+            self.pool.submit(fn).add_done_callback(lambda future, key=key: finished(key, future))
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class StatsSampler:
+    """Échantillonne les stats des conteneurs démarrés via un pool partagé et livre un seul lot de résultats par tick"""
+
+    def __init__(self, client_for, running_ids, on_sample, interval=STATS_INTERVAL, workers=STATS_WORKERS):
+        self.client_for = client_for  # client_for(ID) -> client Docker de l'hôte du conteneur
+        self.running_ids = running_ids
+        self.on_sample = on_sample  # on_sample(résultats par ID, IDs démarrés), appelé depuis le thread d'échantillonnage
+        self.interval = interval
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docker-stats")
+        self.previous = {}  # ID -> (cpu_total, system_total) du dernier échantillon
+        self.idle_skip = {}  # ID -> ticks restants avant de rééchantillonner un conteneur inactif
+        self.stopped = threading.Event()
+
+    def start(self):
+        if self.interval > 0:
+            threading.Thread(target=self.__run, daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def __run(self):
+        while not self.stopped.wait(self.interval):
+            running = set(self.running_ids())  # Les conteneurs arrêtés ne sont jamais échantillonnés
+            for cid in [cid for cid in self.previous if cid not in running]:
+                del self.previous[cid]
+                self.idle_skip.pop(cid, None)
+            due = []
+            for cid in running:
+                if self.idle_skip.get(cid, 0) > 0:
+                    self.idle_skip[cid] -= 1
+                else:
+                    due.append(cid)
+            futures = {self.pool.submit(self.__sample, cid): cid for cid in due}
+            results = {}
+            for future in as_completed(futures):
+                cid = futures[future]
+                values = future.result()
+                if values is not None:
+                    results[cid] = values
+            self.on_sample(results, running)
+
+    def __sample(self, cid):
+        try:
+            sample = self.client_for(cid).api.stats(cid, stream=False, one_shot=True)
+        except Exception as e:
+            logging.warning(f"Stats sampling failed for {cid[:12]}: {e}")
+            return None
+        values, self.previous[cid], cpu_percent = stats_values(sample, self.previous.get(cid))
+        if cpu_percent is not None and cpu_percent < STATS_IDLE_CPU:
+            self.idle_skip[cid] = STATS_IDLE_SKIP
+        return values
+
+
+class LogViewer:
+    """Fenêtre de logs intégrée : flux suivi dans un thread, tampon circulaire borné, recherche incrémentale"""
+
+    def __init__(self, root, client_for, cid, name):
+        self.client_for = client_for  # client_for(ID) -> client Docker, résolu dans le thread du flux (connexion possible)
+        self.cid = cid
+        self.pending = deque(maxlen=LOG_BUFFER_LINES)  # Lignes reçues pas encore affichées
+        self.line_count = 0
+        self.stream = None
+        self.closed = False
+        self.search_pos = "1.0"
+
+        self.window = tk.Toplevel(root)
+        self.window.title(f"Logs - {name}")
+        self.window.geometry("900x500")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        search_frame = ttk.Frame(self.window, padding=5)
+        search_frame.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(search_frame, text="Rechercher :").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        entry = ttk.Entry(search_frame, textvariable=self.search_var)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        entry.bind('<KeyRelease-Return>', lambda e: self.next_match())
+        entry.bind('<KeyRelease>', lambda e: self.search())
+        self.match_label = ttk.Label(search_frame, text="")
+        self.match_label.pack(side=tk.LEFT)
+
+        text_frame = ttk.Frame(self.window)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+        self.text = tk.Text(text_frame, wrap=tk.NONE, font=('Monospace', 9))
+        scrollbar = ttk.Scrollbar(text_frame, command=self.text.yview)
+        self.text.config(yscrollcommand=scrollbar.set, state=tk.DISABLED)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.tag_configure("match", background="yellow")
+        self.text.tag_configure("current", background="orange")
+
+        threading.Thread(target=self.__follow, daemon=True).start()
+        self.window.after(LOG_FRAME_MS, self.__pump)
+
+    def __follow(self):
+        """Lit le flux de logs (thread dédié); si l'affichage prend du retard, les lignes les plus anciennes sont perdues"""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        partial = ""
+        try:
+            self.stream = self.client_for(self.cid).api.logs(self.cid, stream=True, follow=True, tail=LOG_TAIL)
+            if self.closed:
+                self.stream.close()
+                return
+            for chunk in self.stream:
+                lines = (partial + decoder.decode(chunk)).split("\n")
+                partial = lines.pop()
+                self.pending.extend(lines)
+            if partial:
+                self.pending.append(partial)
+            self.pending.append("--- Fin du flux de logs ---")
+        except Exception as e:
+            if not self.closed:
+                logging.error(f"Log stream for {self.cid[:12]} failed: {e}")
+                self.pending.append(f"--- Erreur: {e} ---")
+
+    def __pump(self):
+        """Ajoute en une fois les lignes reçues depuis le dernier passage"""
+        if self.closed:
+            return
+        if self.pending:
+            lines = [self.pending.popleft() for _ in range(len(self.pending))]
+            at_bottom = self.text.yview()[1] >= 1.0
+            self.text.config(state=tk.NORMAL)
+            self.text.insert(tk.END, "\n".join(lines) + "\n")
+            self.line_count += len(lines)
+            overflow = self.line_count - LOG_BUFFER_LINES
+            if overflow > 0:
+                self.text.delete("1.0", f"{overflow + 1}.0")
+                self.line_count -= overflow
+            self.text.config(state=tk.DISABLED)
+            # Seules les nouvelles lignes sont parcourues par la recherche en cours
+            self.__highlight(f"{max(1, self.line_count - len(lines) + 1)}.0")
+            if at_bottom:
+                self.text.see(tk.END)
+        self.window.after(LOG_FRAME_MS, self.__pump)
+
+    def __highlight(self, start):
+        pattern = self.search_var.get()
+        if not pattern:
+            return
+        count = tk.IntVar()
+        index = start
+        while True:
+            index = self.text.search(pattern, index, stopindex=tk.END, nocase=True, count=count)
+            if not index or not count.get():
+                break
+            end = f"{index}+{count.get()}c"
+            self.text.tag_add("match", index, end)
+            index = end
+        self.match_label.config(text=f"{len(self.text.tag_ranges('match')) // 2} résultat(s)")
+
+    def search(self):
+        """Relance la recherche sur tout le tampon à chaque frappe"""
+        self.text.tag_remove("match", "1.0", tk.END)
+        self.text.tag_remove("current", "1.0", tk.END)
+        self.match_label.config(text="")
+        self.search_pos = "1.0"
+        self.__highlight("1.0")
+        self.next_match()
+
+    def next_match(self):
+        match = self.text.tag_nextrange("match", self.search_pos) or self.text.tag_nextrange("match", "1.0")
+        if not match:
+            return
+        self.text.tag_remove("current", "1.0", tk.END)
+        self.text.tag_add("current", *match)
+        self.text.see(match[0])
+        self.search_pos = match[1]
+
+    def close(self):
+        self.closed = True
+        if self.stream is not None:
+            self.stream.close()
+        self.window.destroy()
+
+
+class PerfPanel:
+    """Fenêtre des durées mesurées (p50/p95/p99) par opération, rafraîchie en continu, avec export"""
+
+    COLUMNS = (("Operation", "Opération", 300), ("Count", "Appels", 70), ("p50", "p50 (ms)", 80),
+               ("p95", "p95 (ms)", 80), ("p99", "p99 (ms)", 80), ("Max", "Max (ms)", 80))
+
+    def __init__(self, root, on_status):
+        self.on_status = on_status
+        self.items = {}  # Opération -> item du Treeview
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Performances")
+        self.window.geometry("720x400")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        btn_frame = ttk.Frame(self.window, padding=5)
+        btn_frame.pack(side=tk.BOTTOM)
+        ttk.Button(btn_frame, text="Exporter JSON", command=lambda: self.export("json")).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Exporter Prometheus", command=lambda: self.export("prom")).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Fermer", command=self.close).pack(side=tk.LEFT, padx=2)
+
+        self.tree = ttk.Treeview(self.window, columns=[column for column, _, _ in self.COLUMNS], show="headings")
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=tk.W if column == "Operation" else tk.E)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.job = None
+        self.__refresh()
+
+    def __refresh(self):
+        for name, stats in timings.summary().items():
+            values = (name, stats["count"], stats["p50_ms"], stats["p95_ms"], stats["p99_ms"], stats["max_ms"])
+            item = self.items.get(name)
+            if item is None:
+                # Les opérations arrivent triées : une nouvelle opération s'insère à sa place
+                self.items[name] = self.tree.insert("", sorted(self.items.keys() | {name}).index(name), values=values)
+            else:
+                self.tree.item(item, values=values)
+        self.job = self.window.after(PERF_REFRESH_MS, self.__refresh)
+
+    def export(self, kind):
+        path = f"{METRICS_FILE}.{kind}"
+        try:
+            if kind == "json":
+                write_json_atomic(path, timings.summary())
+            else:
+                os.makedirs(STATE_DIR, exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write(timings.prometheus())
+            self.on_status(f"Mesures exportées dans {path}")
+        except Exception as e:
+            self.on_status(f"Erreur d'export: {e}")
+            logging.error(f"Erreur lors de l'export des mesures: {e}")
+
+    def close(self):
+        if self.job is not None:
+            self.window.after_cancel(self.job)
+        self.window.destroy()
+
+
+class HistoryView:
+    """Historique des opérations (journal) pour un conteneur ou pour tous, lu hors du thread Tk"""
+
+    COLUMNS = (("Date", "Date", 140), ("Operation", "Opération", 80), ("Container", "Conteneur", 160),
+               ("Outcome", "Résultat", 70), ("Duration", "Durée (ms)", 80), ("Detail", "Détail", 400))
+
+    def __init__(self, root, pool, load, title):
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+        self.window.geometry("940x360")
+
+        btn_frame = ttk.Frame(self.window, padding=5)
+        btn_frame.pack(side=tk.BOTTOM)
+        ttk.Button(btn_frame, text="Actualiser", command=lambda: self.reload(pool, load)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Fermer", command=self.window.destroy).pack(side=tk.LEFT, padx=2)
+
+        self.tree = ttk.Treeview(self.window, columns=[column for column, _, _ in self.COLUMNS], show="headings")
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=tk.E if column == "Duration" else tk.W)
+        self.tree.tag_configure("error", foreground="#B00020")
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.reload(pool, load)
+
+    def reload(self, pool, load):
+        def done(future):
+            try:
+                entries, error = future.result(), None
+            except Exception as e:
+                entries, error = [], e
+            self.window.after(0, self.__show, entries, error)
+
+        pool.submit(load).add_done_callback(done)
+
+    def __show(self, entries, error):
+        if not self.window.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        if error is not None:
+            self.tree.insert("", tk.END, values=("", "", "", "erreur", "", str(error)), tags=("error",))
+            return
+        for entry in entries:
+            date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["time"]))
+            container = entry.get("name") or (entry.get("container") or "")[:12] or entry.get("resource", "")
+            if entry.get("host") and entry["host"] != "local":
+                container = f"{container} @ {entry['host']}"
+            ok = entry.get("outcome") == "ok"
+            detail = (entry.get("command") or entry.get("detail") or "") if ok else entry.get("error", "")
+            self.tree.insert("", tk.END, values=(date, entry["op"], container, "ok" if ok else "erreur",
+                                                 entry.get("duration_ms", ""), detail),
+                             tags=() if ok else ("error",))
+
+
+class DiskUsageView:
+    """Espace disque par hôte (images, conteneurs arrêtés, volumes) et nettoyage en parallèle.
+    Chaque hôte est interrogé dans le pool et ses lignes sont ajoutées par paquets dès qu'il répond."""
+
+    KINDS = {"container": "Conteneur", "image": "Image", "volume": "Volume"}
+    COLUMNS = (("Kind", "Type", 90), ("Host", "Hôte", 90), ("Name", "Nom", 260), ("Detail", "Détail", 260),
+               ("Size", "Taille", 90), ("Reclaimable", "Récupérable", 90))
+
+    def __init__(self, root, executor, backend, on_status):
+        self.executor = executor
+        self.backend = backend
+        self.on_status = on_status
+        self.rows = {}  # Item du Treeview -> ligne de disk_usage_rows()
+        self.pending = []  # Lignes reçues pas encore insérées
+        self.job = None
+        self.busy = False
+        self.generation = 0  # Les réponses d'un chargement remplacé depuis sont ignorées
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Ressources")
+        self.window.geometry("940x480")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        btn_frame = ttk.Frame(self.window, padding=5)
+        btn_frame.pack(side=tk.BOTTOM)
+        ttk.Button(btn_frame, text="Actualiser", command=lambda: self.load(max_age=0)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Tout sélectionner", command=self.select_visible).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Supprimer la sélection", command=self.delete_selection).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Nettoyer (prune)", command=self.prune).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Fermer", command=self.close).pack(side=tk.LEFT, padx=2)
+
+        self.summary_label = ttk.Label(self.window, text="", anchor=tk.W)
+        self.summary_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+
+        filter_frame = ttk.Frame(self.window)
+        filter_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Label(filter_frame, text="Filtrer (type, nom, image, état) :").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        filter_entry.bind('<KeyRelease>', lambda e: self.apply_filter())
+
+        self.tree = ttk.Treeview(self.window, columns=[column for column, _, _ in self.COLUMNS], show="headings",
+                                 selectmode="extended")
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=tk.E if column in ("Size", "Reclaimable") else tk.W)
+        self.tree.tag_configure("reclaimable", foreground="#B00020")
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.load()
+
+    def load(self, max_age=DISK_USAGE_TTL):
+        """(Re)charge toutes les ressources; max_age=0 ignore le cache du backend"""
+        self.tree.delete(*self.tree.get_children())
+        self.rows.clear()
+        self.pending.clear()
+        self.generation += 1
+        hosts = list(self.backend.hosts.hosts)
+        remaining = {"hosts": len(hosts), "generation": self.generation}
+        self.summary_label.config(text="Calcul de l'espace disque...")
+
+        def done(host_name, future):
+            self.window.after(0, self.__on_host_loaded, host_name, future, remaining)
+
+        for host_name in hosts:
+            future = self.executor.pool.submit(self.backend.disk_usage, host_name, max_age)
+            future.add_done_callback(lambda future, host_name=host_name: done(host_name, future))
+
+    def __on_host_loaded(self, host_name, future, remaining):
+        if not self.window.winfo_exists() or remaining["generation"] != self.generation:
+            return
+        remaining["hosts"] -= 1
+        error = future.exception()
+        if error is not None:
+            self.on_status(f"Espace disque indisponible pour {host_name}: {error}")
+            logging.error(f"Disk usage failed on {host_name}: {error}")
+        else:
+            self.pending.extend(sorted(future.result(), key=lambda row: -row["reclaimable"]))
+            if self.job is None:
+                self.job = self.window.after(0, self.__flush)
+        if not remaining["hosts"] and not self.pending:
+            self.__update_summary()
+
+    def __flush(self):
+        """Insère les lignes reçues par paquets de TREE_CHUNK_SIZE pour ne pas bloquer la fenêtre principale"""
+        chunk, self.pending = self.pending[:TREE_CHUNK_SIZE], self.pending[TREE_CHUNK_SIZE:]
+        for row in chunk:
+            item = self.tree.insert("", tk.END, values=(
+                self.KINDS[row["kind"]], row["host"], row["name"], row["detail"], format_bytes(row["size"]),
+                format_bytes(row["reclaimable"]) if row["reclaimable"] else ""),
+                tags=("reclaimable",) if row["reclaimable"] else ())
+            self.rows[item] = row
+        self.job = self.window.after(0, self.__flush) if self.pending else None
+        if self.filter_var.get():
+            self.apply_filter()
+        self.__update_summary()
+
+    def __update_summary(self):
+        totals = {kind: 0 for kind in self.KINDS}
+        for row in self.rows.values():
+            totals[row["kind"]] += row["reclaimable"]
+        self.summary_label.config(text="Récupérable : " + ", ".join(
+            f"{label.lower()}s {format_bytes(totals[kind])}" for kind, label in self.KINDS.items())
+            + f" (total {format_bytes(sum(totals.values()))})")
+
+    def apply_filter(self):
+        query = self.filter_var.get().lower()
+        for item, row in self.rows.items():
+            text = " ".join((self.KINDS[row["kind"]], row["name"], row["detail"], row["host"])).lower()
+            if query in text:
+                self.tree.move(item, "", tk.END)
+            else:
+                self.tree.detach(item)
+
+    def select_visible(self):
+        self.tree.selection_set(self.tree.get_children())
+
+    def __run(self, phases, describe):
+        """Exécute les phases l'une après l'autre, les tâches d'une même phase en parallèle.
+        Les conteneurs passent avant les images et les volumes qu'ils retiennent.
+        phases : [{clé: (tâche, on_success(clé) -> octets récupérés)}]"""
+        if self.busy:
+            return
+        self.busy = True
+        outcome = {"done": 0, "errors": 0, "reclaimed": 0}
+
+        def run_phase(index):
+            while index < len(phases) and not phases[index]:
+                index += 1
+            if index == len(phases):
+                self.busy = False
+                message = describe(outcome)
+                self.on_status(message)
+                logging.info(message)
+                if self.window.winfo_exists():
+                    self.load(max_age=0)
+                return
+            tasks = [(key, task) for key, (task, _) in phases[index].items()]
+            self.executor.run_bulk(tasks, lambda key, error: on_progress(phases[index][key][1], key, error),
+                                   lambda results: run_phase(index + 1))
+
+        def on_progress(on_success, key, error):
+            if error is None:
+                outcome["done"] += 1
+                outcome["reclaimed"] += on_success(key)
+            else:
+                outcome["errors"] += 1
+                self.on_status(f"Erreur: {error}")
+                logging.error(f"Cleanup failed for {key}: {error}")
+
+        run_phase(0)
+
+    def delete_selection(self):
+        phases = [{}, {}]
+        for item in self.tree.selection():
+            row = self.rows[item]
+
+            def remove(row=row):
+                self.backend.remove_resource(row["host"], row["kind"], row["id"])
+
+            def removed(item, row=row):
+                if self.window.winfo_exists() and self.tree.exists(item):
+                    self.tree.delete(item)
+                return row["reclaimable"] or row["size"]
+
+            phases[row["kind"] != "container"][item] = (remove, removed)
+        if not any(phases):
+            return
+        self.on_status(f"Suppression de {sum(map(len, phases))} ressource(s)...")
+        self.__run(phases, lambda outcome: f"{outcome['done']} ressource(s) supprimée(s), "
+                                           f"{format_bytes(outcome['reclaimed'])} récupérés"
+                                           + (f", {outcome['errors']} en échec" if outcome["errors"] else ""))
+
+    def prune(self):
+        if not messagebox.askyesno("Nettoyer", "Supprimer les conteneurs arrêtés, les images orphelines et les "
+                                               "volumes inutilisés de tous les hôtes ?", parent=self.window):
+            return
+        phases = [{}, {}]
+        for host_name in self.backend.hosts.hosts:
+            for kind in ("container", "image", "volume"):
+                result = {}
+
+                def prune(host_name=host_name, kind=kind, result=result):
+                    result.update(self.backend.prune(host_name, kind))
+
+                def pruned(key, result=result):
+                    return result["reclaimed"]
+
+                phases[kind != "container"][f"{host_name}/{kind}"] = (prune, pruned)
+        self.on_status("Nettoyage en cours...")
+        self.__run(phases, lambda outcome: f"Nettoyage terminé : {format_bytes(outcome['reclaimed'])} récupérés"
+                                           + (f", {outcome['errors']} en échec" if outcome["errors"] else ""))
+
+    def close(self):
+        if self.job is not None:
+            self.window.after_cancel(self.job)
+        self.window.destroy()
+
+
+class GroupView:
+    """Groupes de commandes : lancement d'un groupe entier et avancement global du lancement en cours"""
+
+    STAGES = {"network": "réseau", "pull": "image", "launch": "conteneur"}
+
+    def __init__(self, root, pool, backend, on_launch):
+        self.pool = pool
+        self.backend = backend
+        self.on_launch = on_launch  # on_launch(nom du groupe)
+        self.groups = {}
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Groupes")
+        self.window.geometry("720x320")
+
+        btn_frame = ttk.Frame(self.window, padding=5)
+        btn_frame.pack(side=tk.BOTTOM)
+        ttk.Button(btn_frame, text="Lancer", command=self.launch).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Supprimer le groupe", command=self.delete).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Fermer", command=self.window.destroy).pack(side=tk.LEFT, padx=2)
+
+        self.progress = ttk.Progressbar(self.window, mode="determinate")
+        self.progress.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+        self.progress_label = ttk.Label(self.window, text="")
+        self.progress_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5)
+
+        self.tree = ttk.Treeview(self.window, columns=("Group", "Count", "Members"), show="headings", selectmode="browse")
+        for column, heading, width in (("Group", "Groupe", 140), ("Count", "Commandes", 80), ("Members", "Conteneurs", 480)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=tk.E if column == "Count" else tk.W)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.tree.bind('<Double-1>', lambda e: self.launch())
+        self.reload()
+
+    def reload(self):
+        def done(future):
+            try:
+                groups = future.result()
+            except Exception as e:
+                logging.error(f"Erreur lors de la lecture des groupes: {e}")
+                return
+            self.window.after(0, self.__show, groups)
+
+        self.pool.submit(self.backend.list_groups).add_done_callback(done)
+
+    def __show(self, groups):
+        if not self.window.winfo_exists():
+            return
+        self.groups = groups
+        self.tree.delete(*self.tree.get_children())
+        for name, keys in sorted(groups.items()):
+            names = [(self.backend.commands.get_record(key) or {}).get("name") or key for key in keys]
+            self.tree.insert("", tk.END, iid=name, values=(name, len(keys), ", ".join(names)))
+
+    def selected(self):
+        selection = self.tree.selection()
+        return selection[0] if selection else None
+
+    def launch(self):
+        name = self.selected()
+        if name is not None:
+            self.on_launch(name)
+
+    def delete(self):
+        name = self.selected()
+        if name is not None:
+            self.pool.submit(self.backend.set_group, name, [])
+
+    def show_progress(self, params):
+        self.progress.config(maximum=max(params["total"], 1), value=params["done"])
+        text = f"{params['name']} : {params['done']}/{params['total']} - {self.STAGES[params['stage']]} {params['item']}"
+        if params["error"]:
+            text += f" (erreur : {params['error']})"
+        self.progress_label.config(text=text)
+
+
+class CommandListView:
+    """Liste virtualisée des commandes : seules les lignes visibles sont rendues dans le widget Text"""
+
+    def __init__(self, parent, height, on_launch, on_context_menu):
+        self.height = height
+        self.on_launch = on_launch  # on_launch(clé, commande)
+        self.on_context_menu = on_context_menu  # on_context_menu(event, clé, commande)
+        self.entries = []  # (clé, commande) dans l'ordre d'affichage
+        self.index = {}  # clé -> texte indexé par le filtre
+        self.filtered = []
+        self.query = ""
+        self.top = 0  # Index de la première entrée rendue
+        self.rendered = 0
+        self.highlighted = None  # Ligne du widget actuellement surlignée
+
+        frame = ttk.Frame(parent)
+        frame.pack(fill=tk.X, padx=5, pady=5)
+        filter_frame = ttk.Frame(frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 2))
+        ttk.Label(filter_frame, text="Filtrer (nom, image, réseau) :").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        filter_entry.bind('<KeyRelease>', lambda e: self.apply_filter())
+        self.count_label = ttk.Label(filter_frame, text="")
+        self.count_label.pack(side=tk.LEFT)
+
+        self.text = tk.Text(frame, height=height, wrap=tk.WORD, cursor="hand2")
+        self.scrollbar = ttk.Scrollbar(frame, command=self.__on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.text.config(state=tk.DISABLED)
+        self.text.tag_configure("even", background="#F4CFDF")
+        self.text.tag_configure("odd", background="#B6D8F2")
+        self.text.tag_configure("highlight", background="lightblue")  # Créé en dernier : prioritaire sur even/odd
+        self.text.bind('<Motion>', self.__on_motion)
+        self.text.bind('<Leave>', self.__clear_highlight)
+        self.text.bind('<Double-1>', self.__on_double_click)
+        self.text.bind('<Button-3>', self.__on_right_click)
+        self.text.bind('<MouseWheel>', lambda e: self.scroll_to(self.top - (1 if e.delta > 0 else -1)))
+        self.text.bind('<Button-4>', lambda e: self.scroll_to(self.top - 1))
+        self.text.bind('<Button-5>', lambda e: self.scroll_to(self.top + 1))
+
+    def set_entries(self, entries, index):
+        """Remplace les entrées (et leur texte indexé) en gardant le filtre et la position de défilement"""
+        self.entries = entries
+        self.index = index
+        self.query = None
+        self.apply_filter(keep_position=True)
+
+    def apply_filter(self, keep_position=False):
+        query = self.filter_var.get().strip().lower()
+        if query == self.query:
+            return
+        # Une requête qui prolonge la précédente ne parcourt que les résultats précédents
+        source = self.filtered if self.query and query.startswith(self.query) else self.entries
+        tokens = query.split()
+        self.filtered = [entry for entry in source if all(token in self.index[entry[0]] for token in tokens)]
+        self.query = query
+        self.count_label.config(text=f"{len(self.filtered)}/{len(self.entries)}")
+        self.scroll_to(self.top if keep_position else 0, force=True)
+
+    def scroll_to(self, top, force=False):
+        top = max(0, min(top, len(self.filtered) - 1))
+        if top != self.top or force:
+            self.top = top
+            self.render()
+        return "break"
+
+    def render(self):
+        """Ne rend que les `height` entrées à partir de `top` (une entrée occupe au moins une ligne)"""
+        rows = self.filtered[self.top:self.top + self.height]
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        for i, (key, cmd) in enumerate(rows, start=self.top):
+            self.text.insert(tk.END, f"{key}: {cmd}\n", "even" if i % 2 == 0 else "odd")
+        self.text.config(state=tk.DISABLED)
+        self.rendered = len(rows)
+        self.highlighted = None
+        total = len(self.filtered)
+        if total:
+            self.scrollbar.set(self.top / total, (self.top + len(rows)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def __on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(int(float(args[0]) * len(self.filtered)))
+        elif action == "scroll":
+            step = self.height if args[1] == "pages" else 1
+            self.scroll_to(self.top + int(args[0]) * step)
+
+    def __line_at(self, event):
+        return int(self.text.index("@%d,%d" % (event.x, event.y)).split('.')[0])
+
+    def entry_at(self, event):
+        line = self.__line_at(event)
+        if 1 <= line <= self.rendered:
+            return self.filtered[self.top + line - 1]
+        return None
+
+    def __on_motion(self, event):
+        """Déplace le surlignage d'une ligne à l'autre sans parcourir tout le document"""
+        line = self.__line_at(event)
+        if line == self.highlighted:
+            return
+        self.__clear_highlight()
+        if 1 <= line <= self.rendered:
+            self.text.tag_add("highlight", f"{line}.0", f"{line}.end")
+            self.highlighted = line
+
+    def __clear_highlight(self, event=None):
+        if self.highlighted is not None:
+            self.text.tag_remove("highlight", f"{self.highlighted}.0", f"{self.highlighted}.end")
+            self.highlighted = None
+
+    def __on_double_click(self, event):
+        entry = self.entry_at(event)
+        if entry:
+            self.on_launch(*entry)
+
+    def __on_right_click(self, event):
+        entry = self.entry_at(event)
+        if entry:
+            self.on_context_menu(event, *entry)
+
+
+class ShellCache:
+    """Shell disponible (bash ou sh) par ID d'image. Une demande de l'utilisateur passe par le pool d'actions, la
+    détection anticipée par un petit pool à part pour ne jamais retarder démarrages et arrêts.
+    Un conteneur recréé sur une autre image change d'ID d'image : l'ancienne détection ne s'applique plus."""
+
+    SHELLS = ("bash", "sh")
+
+    def __init__(self, client_for, pool):
+        self.client_for = client_for  # client_for(ID) -> client Docker de l'hôte du conteneur
+        self.pool = pool
+        self.prewarm_pool = ThreadPoolExecutor(max_workers=SHELL_PREWARM_WORKERS, thread_name_prefix="docker-shell")
+        self.lock = threading.Lock()
+        self.shells = {}  # ID d'image -> shell trouvé ("" si aucun)
+        self.images = {}  # ID complet du conteneur -> ID d'image
+        self.pending = {}  # ID d'image -> (détection en cours, anticipée)
+
+    def track(self, images, removed=(), complete=False):
+        """Note l'image ({ID: ID d'image}) des conteneurs modifiés; après un listing complet, oublie les images
+        qui ne servent plus"""
+        with self.lock:
+            self.images.update(images)
+            for cid in removed:
+                self.images.pop(cid, None)
+            if complete:
+                used = set(self.images.values())
+                self.shells = {image: shell for image, shell in self.shells.items() if image in used}
+
+    def get(self, cid):
+        """Shell connu pour l'image du conteneur, ou None s'il n'a pas encore été détecté"""
+        with self.lock:
+            return self.shells.get(self.images.get(cid))
+
+    def detect(self, cid, prewarm=False):
+        """Future du shell du conteneur; une seule détection à la fois par image"""
+        with self.lock:
+            image = self.images.get(cid)
+            if image in self.shells:
+                future = Future()
+                future.set_result(self.shells[image])
+                return future
+            pending, anticipated = self.pending.get(image, (None, False)) if image else (None, False)
+            # Une détection anticipée encore en file est reprise par le pool d'actions quand l'utilisateur attend
+            if pending is not None and (prewarm or not anticipated or not pending.cancel()):
+                return pending
+            future = (self.prewarm_pool if prewarm else self.pool).submit(self.__probe, cid, image)
+            if image:
+                self.pending[image] = (future, prewarm)
+            return future
+
+    def prewarm(self, cids):
+        for cid in cids:
+            if self.get(cid) is None:
+                self.detect(cid, prewarm=True)
+
+    def shutdown(self):
+        self.prewarm_pool.shutdown(wait=False, cancel_futures=True)
+
+    def __probe(self, cid, image):
+        try:
+            shell = ""
+            api = self.client_for(cid).api
+            for candidate in self.SHELLS:
+                exec_id = api.exec_create(cid, [candidate, "-c", "exit 0"], stdout=False, stderr=True)['Id']
+                api.exec_start(exec_id)
+                if api.exec_inspect(exec_id).get('ExitCode') == 0:
+                    shell = candidate
+                    break
+            # Seul un résultat obtenu sans erreur API est mis en cache
+            if image:
+                with self.lock:
+                    self.shells[image] = shell
+            return shell
+        finally:
+            with self.lock:
+                self.pending.pop(image, None)
+
+
+class CommandStore:
+    """Commandes de lancement par ID court, analysées une seule fois et dédoublonnées par empreinte.
+    Les écritures sur disque sont regroupées et atomiques."""
+
+    def __init__(self, path, on_change):
+        self.path = path
+        self.on_change = on_change  # Appelé une fois par écriture, depuis n'importe quel thread
+        self.lock = threading.Lock()
+        self.records = {}  # ID court -> enregistrement (commande + champs analysés + empreinte)
+        self.by_fingerprint = {}  # Empreinte -> ID court
+        self.aliases = {}  # ID court d'un doublon -> ID court de l'entrée gardée
+        self.by_network = defaultdict(set)  # Réseau -> IDs courts (suggestion de groupe)
+        self.dirty = False
+        self.timer = None
+        self.load()
+
+    def load(self):
+        data = load_json(self.path, {})
+        if data.get("version") == 3:
+            # Format structuré : aucune analyse shlex au démarrage
+            for cid, record in data.get("commands", {}).items():
+                self.__add(cid, record)
+        else:
+            # Ancien format {ID: commande} : migré au prochain flush
+            for cid, cmd in data.items():
+                self.__add(cid, self.__record(cmd))
+            self.dirty = bool(data)
+
+    @staticmethod
+    def __record(cmd):
+        record = parse_run_command(cmd)
+        record["command"] = cmd
+        record["fingerprint"] = command_fingerprint(record)
+        return record
+
+    def __add(self, cid, record):
+        """Indexe un enregistrement; un doublon d'empreinte devient un alias de l'entrée existante"""
+        existing = self.by_fingerprint.get(record["fingerprint"])
+        if existing is not None and existing != cid:
+            self.aliases[cid] = existing
+            return False
+        self.records[cid] = record
+        self.by_fingerprint[record["fingerprint"]] = cid
+        for network in record["networks"]:
+            self.by_network[network].add(cid)
+        return True
+
+    def __remove(self, cid):
+        record = self.records.pop(cid)
+        del self.by_fingerprint[record["fingerprint"]]
+        for network in record["networks"]:
+            self.by_network[network].discard(cid)
+
+    def __contains__(self, cid):
+        with self.lock:
+            return cid in self.records or cid in self.aliases
+
+    def get(self, cid, default=None):
+        with self.lock:
+            record = self.records.get(self.aliases.get(cid, cid))
+            return record["command"] if record else default
+
+    def get_record(self, cid):
+        with self.lock:
+            return self.records.get(self.aliases.get(cid, cid))
+
+    def find(self, network):
+        """IDs des commandes qui utilisent un réseau (recherche indexée)"""
+        with self.lock:
+            return sorted(self.by_network.get(network, ()))
+
+    def items(self):
+        """Copie des couples (ID, commande), utilisable pendant que d'autres threads écrivent"""
+        with self.lock:
+            return [(cid, record["command"]) for cid, record in self.records.items()]
+
+    def search_index(self):
+        with self.lock:
+            return {cid: command_search_text(cid, record) for cid, record in self.records.items()}
+
+    def export(self):
+        """Copie des enregistrements, sérialisable en JSON"""
+        with self.lock:
+            return {cid: dict(record) for cid, record in self.records.items()}
+
+    def set(self, cid, cmd, host=None):
+        """Enregistre une commande (et l'hôte où la relancer); l'écriture disque est différée de COMMANDS_FLUSH_DELAY"""
+        record = self.__record(cmd)
+        with self.lock:
+            cid = self.aliases.pop(cid, cid)
+            current = self.records.get(cid)
+            if current is not None:
+                host = host or current.get("host")
+                if current["command"] == cmd and current.get("host") == host:
+                    return
+                self.__remove(cid)
+            if host:
+                record["host"] = host  # Hors empreinte : la même commande sur deux hôtes reste un doublon
+            if not self.__add(cid, record) and current is None:
+                return  # Doublon d'une commande déjà connue : rien à écrire
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(COMMANDS_FLUSH_DELAY, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Écrit toutes les modifications en attente en une seule fois (fichier temporaire + rename)"""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.dirty:
+                return
+            try:
+                with timings.measure("io commands write"):
+                    write_json_atomic(self.path, {"version": 3, "commands": self.records})
+                self.dirty = False
+            except Exception as e:
+                logging.error(f"Erreur lors de la sauvegarde des commandes: {e}")
+                return
+        self.on_change()
+
+
+class GroupStore:
+    """Groupes nommés de commandes (clés du CommandStore), enregistrés à chaque modification"""
+
+    def __init__(self, path, on_change):
+        self.path = path
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.groups = load_json(path, {})  # Nom -> clés des commandes, dans l'ordre d'ajout
+
+    def all(self):
+        with self.lock:
+            return {name: list(keys) for name, keys in self.groups.items()}
+
+    def get(self, name):
+        with self.lock:
+            keys = self.groups.get(name)
+            return list(keys) if keys is not None else None
+
+    def set(self, name, keys):
+        """Remplace les membres d'un groupe; une liste vide supprime le groupe"""
+        with self.lock:
+            if keys:
+                self.groups[name] = list(dict.fromkeys(keys))
+            else:
+                self.groups.pop(name, None)
+            try:
+                write_json_atomic(self.path, self.groups)
+            except Exception as e:
+                logging.error(f"Erreur lors de la sauvegarde des groupes: {e}")
+        self.on_change()
+
+
+class InspectCache:
+    """Cache disque LRU des commandes reconstruites par inspect, indexé par ID complet + date de création"""
+
+    def __init__(self, path, max_entries=INSPECT_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict(load_json(path, {}))  # Du moins au plus récemment utilisé
+        self.dirty = False
+        self.__evict()
+
+    def __evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.dirty = True
+
+    @staticmethod
+    def key(summary):
+        return f"{summary['Id']}:{summary.get('Created', '')}"
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.dirty = True
+            self.__evict()
+
+    def prune(self, live_keys):
+        """Oublie les conteneurs qui n'existent plus"""
+        with self.lock:
+            for key in [key for key in self.entries if key not in live_keys]:
+                del self.entries[key]
+                self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            try:
+                with timings.measure("io inspect cache write"):
+                    write_json_atomic(self.path, self.entries)
+                self.dirty = False
+            except Exception as e:
+                logging.error(f"Erreur lors de la sauvegarde du cache d'inspect: {e}")
+
+
+class DockerHost:
+    """Un daemon Docker : client créé à la demande et disjoncteur qui écarte un moment un hôte qui échoue"""
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.lock = threading.Lock()
+        self.client = None
+        self.failures = 0
+        self.open_until = 0
+
+    def get_client(self):
+        """Client du daemon, créé au premier usage (la création interroge déjà le daemon)"""
+        with self.lock:
+            if self.client is None:
+                with timings.measure("docker connect"):
+                    self.client = docker.from_env() if self.url is None else docker.DockerClient(base_url=self.url)
+                instrument_api(self.client.api)
+                logging.info(f"Connected to Docker host {self.name}")
+            return self.client
+
+    def available(self):
+        return time.monotonic() >= self.open_until
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = 0
+
+    def record_failure(self, error):
+        self.failures += 1
+        logging.error(f"Docker host {self.name} failed ({self.failures}x): {error}")
+        if self.failures >= HOST_FAILURE_THRESHOLD:
+            self.open_until = time.monotonic() + HOST_COOLDOWN
+            logging.warning(f"Docker host {self.name} ignored for {HOST_COOLDOWN}s")
+
+    def cli_args(self):
+        """Arguments de la CLI docker pour viser cet hôte"""
+        return ["-H", self.url] if self.url else []
+
+    def cli_env(self):
+        return dict(os.environ, DOCKER_HOST=self.url) if self.url else None
+
+
+class HostPool:
+    """Daemons configurés; le listing les interroge tous en parallèle avec un délai par hôte"""
+
+    def __init__(self, specs):
+        self.hosts = {name: DockerHost(name, url) for name, url in specs}
+        self.primary = next(iter(self.hosts.values()))
+
+    def get(self, name):
+        return self.hosts.get(name, self.primary)
+
+    def list_containers(self):
+        """Retourne ({hôte: résumés} des hôtes qui ont répondu à temps, {hôte: erreur}).
+        Un hôte lent ou mort ne retarde jamais les autres au-delà de HOST_TIMEOUT."""
+        futures = {}
+        errors = {}
+        for host in self.hosts.values():
+            if not host.available():
+                errors[host.name] = "disjoncteur ouvert"
+                continue
+            future = Future()
+            threading.Thread(target=self.__list_host, args=(host, future), daemon=True).start()
+            futures[future] = host
+        done, not_done = wait(futures, timeout=HOST_TIMEOUT)
+        results = {}
+        for future in done:
+            host = futures[future]
+            if future.exception() is None:
+                host.record_success()
+                results[host.name] = future.result()
+            else:
+                host.record_failure(future.exception())
+                errors[host.name] = str(future.exception())
+        for future in not_done:
+            # La réponse tardive sera ignorée
+            futures[future].record_failure(f"pas de réponse en {HOST_TIMEOUT}s")
+            errors[futures[future].name] = "délai dépassé"
+        return results, errors
+
+    @staticmethod
+    def __list_host(host, future):
+        try:
+            future.set_result(host.get_client().api.containers(all=True))
+        except Exception as e:
+            future.set_exception(e)
+
+
+class ContainerEventWatcher:
+    """Abonné longue durée au flux d'événements d'un hôte Docker, filtré sur les conteneurs"""
+
+    def __init__(self, host, on_event, on_resync):
+        self.host = host
+        self.on_event = on_event
+        self.on_resync = on_resync
+        self.stream = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.__run, daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.stream is not None:
+            self.stream.close()
+
+    def __run(self):
+        while not self.stopped.is_set():
+            if not self.host.available():
+                self.stopped.wait(RESYNC_DELAY)  # Disjoncteur ouvert : pas de nouvelle tentative pour l'instant
+                continue
+            try:
+                # S'abonner avant de resynchroniser pour ne perdre aucun événement survenu pendant le listing
+                self.stream = self.host.get_client().events(decode=True, filters={"type": "container"})
+                self.on_resync()
+                for event in self.stream:
+                    if event.get("Action") in CONTAINER_EVENT_ACTIONS:
+                        self.on_event(event)
+                logging.warning(f"Docker event stream closed ({self.host.name})")
+            except Exception as e:
+                if self.stopped.is_set():
+                    break
+                self.host.record_failure(e)
+            # Le flux est tombé : nouvel abonnement puis resynchronisation complète
+            self.stopped.wait(RESYNC_DELAY)
+
+
+class Backend:
+    """Partie commune des deux backends : abonnés aux changements et hôte de chaque conteneur"""
+
+    def __init__(self, host_specs):
+        self.hosts = HostPool(host_specs)
+        self.host_errors = {}  # Hôte -> erreur du dernier listing
+        self.model = ContainerModel()
+        self.listeners = []  # (listener(type, paramètres), est une interface)
+        self.listeners_lock = threading.Lock()
+        self.snapshot_time = None  # Date de l'instantané qui amorce le modèle, None s'il vient d'un daemon
+
+    def add_listener(self, listener, ui=False):
+        with self.listeners_lock:
+            self.listeners.append((listener, ui))
+
+    def remove_listener(self, listener):
+        with self.listeners_lock:
+            self.listeners = [(other, ui) for other, ui in self.listeners if other is not listener]
+
+    def notify(self, kind, **params):
+        """Diffuse un changement à tous les abonnés ('show' ne va qu'aux interfaces); retourne True si une
+        interface l'a reçu"""
+        with self.listeners_lock:
+            listeners = list(self.listeners)
+        delivered = False
+        for listener, ui in listeners:
+            if kind == "show" and not ui:
+                continue
+            try:
+                listener(kind, params)
+                delivered = delivered or ui
+            except Exception as e:
+                logging.error(f"Listener failed on '{kind}': {e}")
+        return delivered
+
+    def host_of(self, cid):
+        """Hôte d'un conteneur connu du modèle (hôte principal à défaut)"""
+        row = self.model.get(cid)
+        return self.hosts.get(row[5] if row else None)
+
+    def client_for(self, cid):
+        return self.host_of(cid).get_client()
+
+
+class DockerBackend(Backend):
+    """Propriétaire de la connexion aux daemons, du modèle des conteneurs, des commandes et du cache d'inspect.
+    Utilisé directement par l'interface ou servi à d'autres processus par ServiceServer."""
+
+    def __init__(self, host_specs):
+        super().__init__(host_specs)
+        self.refresh_scheduler = RefreshScheduler(self.sync_containers, lambda e: self.notify("error", message=str(e)))
+        self.commands = CommandStore(COMMAND_FILE, lambda: self.notify("commands"))
+        self.inspect_cache = InspectCache(INSPECT_CACHE_FILE)
+        self.journal = OperationJournal(JOURNAL_FILE)
+        self.groups = GroupStore(GROUP_FILE, lambda: self.notify("groups"))
+        self.disk_usage_lock = threading.Lock()
+        self.disk_usage_cache = {}  # Hôte -> (instant du calcul, lignes)
+        self.listed_at = None  # Date du dernier listing complet (ou de l'instantané chargé) : date de l'instantané
+        self.listed = False  # Au moins un hôte a répondu depuis le démarrage : l'instantané est à réécrire
+        self.load_snapshot()
+        self.event_watchers = [
+            ContainerEventWatcher(host, lambda event, host=host: self.on_container_event(host, event), self.refresh_scheduler.request)
+            for host in self.hosts.hosts.values()]
+
+    def start(self):
+        # Le flux d'événements fait la première synchronisation complète puis tient la liste à jour
+        for watcher in self.event_watchers:
+            watcher.start()
+        self.refresh_scheduler.request()  # Listing initial même si aucun flux d'événements ne s'ouvre (hôtes injoignables)
+
+    def stop(self):
+        for watcher in self.event_watchers:
+            watcher.stop()
+        self.commands.flush()
+        self.inspect_cache.save()
+        self.save_snapshot()
+        self.journal.close()
+
+    def load_snapshot(self):
+        """Amorce le modèle avec la dernière liste enregistrée, sans contacter aucun daemon"""
+        data = load_json(SNAPSHOT_FILE, {})
+        if data.get("version") != 1:
+            return
+        # Les lignes d'un hôte retiré de la configuration ne seraient jamais réconciliées
+        self.model.load({cid: tuple(row) for cid, row in data["rows"].items() if row[5] in self.hosts.hosts})
+        self.snapshot_time = self.listed_at = data["saved"]
+
+    def save_snapshot(self):
+        """Enregistre le modèle daté de son dernier listing complet; rien n'est réécrit si aucun hôte n'a répondu"""
+        if not self.listed:
+            return
+        try:
+            with timings.measure("io snapshot write"):
+                write_json_atomic(SNAPSHOT_FILE, {"version": 1, "saved": self.listed_at, "rows": self.model.snapshot()})
+        except Exception as e:
+            logging.error(f"Erreur lors de la sauvegarde de l'instantané: {e}")
+
+    def refresh(self):
+        self.refresh_scheduler.request()
+
+    def host_specs(self):
+        return [(host.name, host.url) for host in self.hosts.hosts.values()]
+
+    def snapshot(self):
+        return {"rows": self.model.snapshot(), "host_errors": self.host_errors}
+
+    def set_command(self, cid, cmd):
+        self.commands.set(cid, cmd)
+        self.commands.flush()
+
+    def container_action(self, action, cid):
+        """Démarre, arrête ou supprime un conteneur sur son hôte, avec une entrée au journal des opérations"""
+        if action not in ("start", "stop", "remove"):
+            raise ValueError(f"Action inconnue : {action}")
+        row = self.model.get(cid)
+        host = self.host_of(cid)
+        with self.journal.operation(action, container=cid, name=row[1] if row else None, host=host.name,
+                                    command=self.commands.get(cid[:12])):
+            api = host.get_client().api
+            if action == "start":
+                api.start(cid)
+            elif action == "stop":
+                api.stop(cid)
+            else:
+                api.remove_container(cid, force=True)
+
+    def launch(self, key, cmd, wait_cli=False):
+        """Lance une commande enregistrée sur son hôte; retourne {"id": ID ou None si passé par la CLI, "host": nom}.
+        wait_cli : un repli sur la CLI est lancé détaché (-d) et attendu, un code de retour non nul lève une erreur."""
+        record = self.commands.get_record(key) or parse_run_command(cmd)
+        host = self.hosts.get(record.get("host"))
+        with self.journal.operation("launch", name=record["name"], host=host.name, command=cmd) as entry:
+            entry["container"] = self.__launch_command(host, cmd, record, wait_cli)
+        return {"id": entry["container"], "host": host.name}
+
+    def history(self, key="*", limit=50):
+        return self.journal.history(key, limit)
+
+    def list_groups(self):
+        return self.groups.all()
+
+    def set_group(self, name, keys):
+        self.groups.set(name, keys)
+
+    def launch_group(self, name):
+        """Lance toutes les commandes d'un groupe : réseaux créés d'abord, images absentes téléchargées en parallèle
+        (PULL_WORKERS au plus), puis conteneurs lancés vague par vague selon leurs dépendances.
+        L'avancement est diffusé en notifications "group"; retourne {"launched": [clés], "errors": {clé: message}}."""
+        keys = self.groups.get(name)
+        if keys is None:
+            raise ValueError(f"Groupe inconnu : {name}")
+        records = {key: record for key in keys if (record := self.commands.get_record(key)) is not None}
+        waves = launch_waves(records)
+        networks = {(record.get("host"), network) for record in records.values() for network in command_networks(record)}
+        images = {(record.get("host"), record["image"]) for record in records.values() if record["image"]}
+        total = len(networks) + len(images) + len(records)
+        lock = threading.Lock()
+        progress = {"done": 0}
+        errors = {}  # Clé de commande -> message
+        failed_images = {}  # (hôte, image) -> message
+
+        def step(stage, item, error=None):
+            with lock:
+                progress["done"] += 1
+                done = progress["done"]
+            self.notify("group", name=name, done=done, total=total, stage=stage, item=item,
+                        error=None if error is None else str(error))
+
+        start = time.perf_counter()
+        # Réseaux : rapides, mais préalables à tout le reste
+        for host_name, network in sorted(networks, key=lambda entry: (entry[0] or "", entry[1])):
+            error = None
+            try:
+                api = self.hosts.get(host_name).get_client().api
+                if not any(existing["Name"] == network for existing in api.networks(names=[network])):
+                    api.create_network(network, driver="bridge")
+                    logging.info(f"Réseau {network} créé pour le groupe {name}")
+            except Exception as e:
+                error = e
+                logging.error(f"Création du réseau {network} impossible: {e}")
+            step("network", network, error)
+
+        def pull(host_name, image):
+            api = self.hosts.get(host_name).get_client().api
+            try:
+                api.inspect_image(image)
+                return
+            except docker.errors.ImageNotFound:
+                pass
+            repository, tag = docker.utils.parse_repository_tag(image)
+            logging.info(f"Image {image} absente, téléchargement...")
+            with timings.measure("group pull"):
+                api.pull(repository, tag=tag or "latest")
+
+        with ThreadPoolExecutor(max_workers=PULL_WORKERS, thread_name_prefix="docker-pull") as pool:
+            futures = {pool.submit(pull, *entry): entry for entry in images}
+            for future in as_completed(futures):
+                host_name, image = futures[future]
+                error = future.exception()
+                if error is not None:
+                    failed_images[(host_name, image)] = str(error)
+                    logging.error(f"Téléchargement de {image} impossible: {error}")
+                step("pull", image, error)
+
+        launched = []
+        with ThreadPoolExecutor(max_workers=ACTION_WORKERS, thread_name_prefix="docker-group") as pool:
+            for wave in waves:
+                futures = {}
+                for key in wave:
+                    record = records[key]
+                    failed = [dependency for dependency in command_dependencies(record)
+                              if any(records[other]["name"] == dependency for other in errors)]
+                    if failed:
+                        errors[key] = f"dépendance en échec : {', '.join(sorted(failed))}"
+                    elif (record.get("host"), record["image"]) in failed_images:
+                        errors[key] = f"image indisponible : {failed_images[(record.get('host'), record['image'])]}"
+                    else:
+                        futures[pool.submit(self.launch, key, record["command"], wait_cli=True)] = key
+                        continue
+                    step("launch", record["name"] or key, errors[key])
+                for future in as_completed(futures):
+                    key = futures[future]
+                    error = future.exception()
+                    if error is None:
+                        launched.append(key)
+                    else:
+                        errors[key] = str(error)
+                    step("launch", records[key]["name"] or key, error)
+        logging.info(f"Group {name} launched in {(time.perf_counter() - start) * 1000:.0f} ms "
+                     f"({len(launched)} started, {len(errors)} failed, {len(images)} images, {len(waves)} waves)")
+        return {"launched": launched, "errors": errors}
+
+    def disk_usage(self, host_name=None, max_age=DISK_USAGE_TTL):
+        """Ressources d'un hôte (images, conteneurs arrêtés, volumes); /system/df est coûteux pour le daemon,
+        son résultat est gardé max_age secondes"""
+        host = self.hosts.get(host_name)
+        with self.disk_usage_lock:
+            cached = self.disk_usage_cache.get(host.name)
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        with timings.measure("disk usage"):
+            rows = disk_usage_rows(host.get_client().api.df(), host.name)
+        with self.disk_usage_lock:
+            self.disk_usage_cache[host.name] = (time.monotonic(), rows)
+        return rows
+
+    def __invalidate_disk_usage(self, host):
+        with self.disk_usage_lock:
+            self.disk_usage_cache.pop(host.name, None)
+
+    def prune(self, host_name, kind):
+        """Nettoyage d'un type de ressource sur un hôte; retourne {"deleted": nombre, "reclaimed": octets}"""
+        host = self.hosts.get(host_name)
+        api = host.get_client().api
+        with self.journal.operation(f"prune {kind}", host=host.name) as entry:
+            if kind == "container":
+                result = api.prune_containers()
+                deleted = result.get("ContainersDeleted")
+            elif kind == "image":
+                result = api.prune_images(filters={"dangling": True})
+                deleted = result.get("ImagesDeleted")
+            elif kind == "volume":
+                # Depuis l'API 1.42, le prune ne supprime que les volumes anonymes sans le filtre all
+                all_volumes = {"all": "true"} if docker.utils.version_gte(api.api_version, "1.42") else None
+                result = api.prune_volumes(filters=all_volumes)
+                deleted = result.get("VolumesDeleted")
+            else:
+                raise ValueError(f"Type de ressource inconnu : {kind}")
+            entry["detail"] = f"{len(deleted or [])} supprimé(s), {format_bytes(result.get('SpaceReclaimed') or 0)}"
+        self.__invalidate_disk_usage(host)
+        return {"deleted": len(deleted or []), "reclaimed": result.get("SpaceReclaimed") or 0}
+
+    def remove_resource(self, host_name, kind, rid):
+        """Supprime une image, un conteneur arrêté ou un volume de la vue des ressources"""
+        host = self.hosts.get(host_name)
+        api = host.get_client().api
+        with self.journal.operation(f"remove {kind}", resource=rid, host=host.name):
+            if kind == "container":
+                api.remove_container(rid)  # Sans force : un conteneur redémarré entre-temps est gardé
+            elif kind == "image":
+                api.remove_image(rid)
+            elif kind == "volume":
+                api.remove_volume(rid)
+            else:
+                raise ValueError(f"Type de ressource inconnu : {kind}")
+        self.__invalidate_disk_usage(host)
+
+    def __launch_command(self, host, cmd, record, wait_cli=False):
+        """Supprime le conteneur homonyme puis lance la commande via l'API de l'hôte (hors du thread Tk).
+        Retourne l'ID du nouveau conteneur, ou None si la commande est passée par la CLI sans être attendue."""
+        client = host.get_client()
+        if record["name"]:
+            try:
+                client.api.remove_container(record["name"], force=True)
+                logging.info(f"Conteneur existant '{record['name']}' supprimé avant relance")
+            except docker.errors.NotFound:
+                pass
+        try:
+            image, command, kwargs, extra_networks = run_spec(record)
+        except ValueError as e:
+            logging.info(f"Lancement via la CLI docker ({e}): {cmd}")
+            if not wait_cli:
+                subprocess.Popen(cmd, shell=True, env=host.cli_env())
+                return None
+            return self.__run_cli_detached(host, cmd)
+        try:
+            container = client.containers.create(image, command, **kwargs)
+        except docker.errors.ImageNotFound:
+            repository, tag = docker.utils.parse_repository_tag(image)
+            logging.info(f"Image {image} absente, téléchargement...")
+            client.images.pull(repository, tag=tag or "latest")
+            container = client.containers.create(image, command, **kwargs)
+        for network in extra_networks:
+            client.api.connect_container_to_network(container.id, network)
+        container.start()
+        self.refresh_container(host, container.id)  # Seule la nouvelle ligne est ajoutée
+        return container.id
+
+    def __run_cli_detached(self, host, cmd):
+        """Exécute 'docker run -d ...' jusqu'au bout : le conteneur existe au retour, ou l'échec est levé"""
+        detached, replaced = re.subn(r"^\s*docker\s+run\b", "docker run -d", cmd, count=1)
+        if not replaced:
+            raise ValueError(f"Commande non reconnue comme 'docker run' : {cmd}")
+        result = subprocess.run(detached, shell=True, env=host.cli_env(), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"docker run a échoué (code {result.returncode})")
+        cid = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else None
+        if cid:
+            self.refresh_container(host, cid)
+        return cid
+
+    @timings.timed("refresh total")
+    def sync_containers(self):
+        """Liste tous les conteneurs en une seule requête par hôte et remplace le modèle (appelé hors du thread Tk)"""
+        start = time.perf_counter()
+        # Listing bas niveau : une seule requête /containers/json, sans inspect par conteneur
+        generation = self.model.begin_sync()
+        with timings.measure("refresh list"):
+            listing, errors = self.hosts.list_containers()  # Tous les hôtes en parallèle, chacun borné par HOST_TIMEOUT
+        with timings.measure("refresh model"):
+            rows = {summary['Id']: summary_row(summary, host) for host, summaries in listing.items() for summary in summaries}
+            result = self.model.replace_all(rows, generation, hosts=set(listing))
+            if result is None:
+                logging.info(f"Stale container list (generation {generation}) discarded")
+                return
+            changed, removed = result
+            self.host_errors = errors
+            if listing:
+                self.listed = True
+                # Un listing partiel garde les lignes anciennes des hôtes muets : la date reste celle du dernier
+                # listing complet (sans instantané précédent, toutes les lignes viennent de ce listing)
+                if not errors or self.listed_at is None:
+                    self.listed_at = time.time()
+            # Sans réponse de tous les hôtes, le listing est partiel : on ne purge rien sur cette base
+            self.notify("rows", changed=changed, removed=removed, complete=not errors)
+            self.notify("hosts", errors=errors)
+        with timings.measure("refresh capture"):
+            # Les inspects ne concernent que les conteneurs dont la commande est inconnue, après l'affichage
+            for host, summaries in listing.items():
+                for summary in summaries:
+                    self.capture_command(self.hosts.get(host), summary)
+        with timings.measure("refresh persist"):
+            self.commands.flush()  # Une seule écriture et un seul rafraîchissement du panneau par resynchronisation
+            if not errors:
+                self.inspect_cache.prune({InspectCache.key(summary) for summaries in listing.values() for summary in summaries})
+            self.inspect_cache.save()
+            self.save_snapshot()
+        logging.info(f"Container list synced in {(time.perf_counter() - start) * 1000:.0f} ms "
+                     f"({len(rows)} containers, {len(changed)} changed, {len(removed)} removed)")
+
+    def on_container_event(self, host, event):
+        """Applique un événement conteneur au modèle et ne diffuse que la ligne modifiée"""
+        cid = event.get("id") or event.get("Actor", {}).get("ID")
+        if not cid:
+            return
+        self.refresh_container(host, cid, removed=event.get("Action") == "destroy")
+
+    @timings.timed("event refresh")
+    def refresh_container(self, host, cid, removed=False):
+        """Relit le résumé d'un seul conteneur sur son hôte et diffuse sa ligne (ou sa suppression)"""
+        summaries = [] if removed else host.get_client().api.containers(all=True, filters={"id": cid})
+        if not summaries:
+            if self.model.remove(cid):
+                self.notify("rows", changed={}, removed=[cid], complete=False)
+            return
+        row = summary_row(summaries[0], host.name)
+        if self.model.upsert(cid, row):
+            self.notify("rows", changed={cid: row}, removed=[], complete=False)
+        self.capture_command(host, summaries[0])
+
+    def capture_command(self, host, summary):
+        """Retrouve la commande d'un conteneur qui n'en a pas : cache d'inspect d'abord, inspect sinon"""
+        cid = summary['Id']
+        if cid[:12] in self.commands:
+            return
+        key = InspectCache.key(summary)
+        entry = self.inspect_cache.get(key)
+        if entry is None:
+            entry = self.get_container_command(cid)
+            if entry is None:
+                return
+            self.inspect_cache.put(key, entry)
+        self.commands.set(cid[:12], entry['command'], host.name)
+
+    def get_container_command(self, cid):
+        """Inspecte un conteneur et retourne l'entrée du cache (commande + champs utiles de l'inspect)"""
+        try:
+            container_info = self.client_for(cid).api.inspect_container(cid)
+            return inspect_entry(container_info)
+        except Exception as e:
+            logging.error(f"Erreur lors de la récupération de la commande pour {cid[:12]}: {e}")
+            return None
+
+
+class ServiceError(Exception):
+    """Erreur retournée par le service (hors erreurs Docker, converties en docker.errors)"""
+
+
+class ServiceHandler(socketserver.StreamRequestHandler):
+    """Une connexion au service : une requête JSON-RPC 2.0 par ligne.
+    'subscribe' répond par l'état courant puis transforme la connexion en flux de notifications."""
+
+    def handle(self):
+        backend = self.server.backend
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                method = request.get("method")
+                params = request.get("params") or {}
+            except (ValueError, AttributeError):
+                self.__send({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Requête illisible"}})
+                continue
+            if method == "subscribe":
+                self.__stream(backend, request.get("id"), params.get("ui", False))
+                return
+            handler = getattr(self, f"rpc_{method}", None) if isinstance(method, str) else None
+            if handler is None:
+                response = {"code": -32601, "message": f"Méthode inconnue : {method}"}
+            else:
+                try:
+                    response = {"result": handler(backend, **params)}
+                except Exception as e:
+                    response = {"code": -32000, "message": str(e), "data": {"type": type(e).__name__}}
+            if "result" not in response:
+                response = {"error": response}
+            self.__send({"jsonrpc": "2.0", "id": request.get("id"), **response})
+
+    def __send(self, message):
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+        self.wfile.flush()
+
+    def __stream(self, backend, request_id, ui):
+        """Répond à 'subscribe' par l'état courant puis relaye les notifications du backend; un abonné qui ne lit
+        plus est déconnecté plutôt que de bloquer le backend ou d'accumuler sans limite"""
+        events = queue.Queue()
+        overflow = threading.Event()
+
+        def listener(kind, params):
+            if events.qsize() >= SERVICE_QUEUE_SIZE:
+                overflow.set()
+            else:
+                events.put((kind, params))
+
+        # S'abonner avant de lire l'état courant : un changement survenu entre les deux est rejoué après lui
+        backend.add_listener(listener, ui=ui)
+        try:
+            self.__send({"jsonrpc": "2.0", "id": request_id, "result": backend.snapshot()})
+            while not overflow.is_set() and not self.server.stopping.is_set():
+                try:
+                    kind, params = events.get(timeout=1)
+                except queue.Empty:
+                    continue
+                self.__send({"jsonrpc": "2.0", "method": kind, "params": params})
+            if overflow.is_set():
+                logging.warning("Service subscriber too slow, disconnected")
+        except OSError:
+            pass  # Abonné parti
+        finally:
+            backend.remove_listener(listener)
+
+    @staticmethod
+    def rpc_ping(backend):
+        return {"pid": os.getpid()}
+
+    @staticmethod
+    def rpc_hosts(backend):
+        return backend.host_specs()
+
+    @staticmethod
+    def rpc_containers(backend):
+        return backend.snapshot()
+
+    @staticmethod
+    def rpc_commands(backend):
+        return backend.commands.export()
+
+    @staticmethod
+    def rpc_refresh(backend):
+        backend.refresh()
+        return True
+
+    @staticmethod
+    def rpc_action(backend, action, id):
+        backend.container_action(action, id)
+        return True
+
+    @staticmethod
+    def rpc_launch(backend, key, command):
+        return backend.launch(key, command)
+
+    @staticmethod
+    def rpc_set_command(backend, id, command):
+        backend.set_command(id, command)
+        return True
+
+    @staticmethod
+    def rpc_groups(backend):
+        return backend.list_groups()
+
+    @staticmethod
+    def rpc_set_group(backend, name, keys):
+        backend.set_group(name, keys)
+        return True
+
+    @staticmethod
+    def rpc_launch_group(backend, name):
+        return backend.launch_group(name)
+
+    @staticmethod
+    def rpc_disk_usage(backend, host=None, max_age=DISK_USAGE_TTL):
+        return backend.disk_usage(host, max_age)
+
+    @staticmethod
+    def rpc_prune(backend, host, kind):
+        return backend.prune(host, kind)
+
+    @staticmethod
+    def rpc_remove_resource(backend, host, kind, id):
+        backend.remove_resource(host, kind, id)
+        return True
+
+    @staticmethod
+    def rpc_history(backend, key="*", limit=50):
+        return backend.history(key, limit)
+
+    @staticmethod
+    def rpc_metrics(backend, format="json"):
+        return timings.prometheus() if format == "prometheus" else timings.summary()
+
+    @staticmethod
+    def rpc_show(backend):
+        return {"shown": backend.notify("show")}
+
+
+def prepare_service_dir(path):
+    """Crée le répertoire du socket (0700) et refuse un répertoire qui n'appartient pas à l'utilisateur ou que
+    d'autres peuvent modifier : un tiers pourrait y placer son propre socket ou verrou"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not os.path.isdir(path) or os.path.islink(path) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise PermissionError(f"Répertoire du service non sûr : {path} (doit appartenir à l'utilisateur, "
+                              f"sans écriture pour les autres)")
+
+
+def peer_uid(sock):
+    """uid du processus à l'autre bout d'un socket unix (None si le système ne fournit pas SO_PEERCRED)"""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    _pid, uid, _gid = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")))
+    return uid
+
+
+class ServiceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Sert un DockerBackend sur un socket unix accessible au seul utilisateur courant"""
+
+    daemon_threads = True
+
+    def __init__(self, path, backend):
+        self.backend = backend
+        self.stopping = threading.Event()
+        if os.path.exists(path):
+            os.remove(path)  # Socket d'un service mort : le verrou garantit qu'aucun autre ne l'utilise
+        super().__init__(path, ServiceHandler)
+
+    def server_bind(self):
+        # Socket créé directement en 0600 : pas de fenêtre entre bind() et chmod()
+        umask = os.umask(0o077)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def verify_request(self, request, client_address):
+        uid = peer_uid(request)
+        if uid is not None and uid != os.getuid():
+            logging.warning(f"Service connection from uid {uid} refused")
+            return False
+        return True
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.stopping.set()
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class ServiceClient:
+    """Client du service : une connexion par appel, plus une connexion longue pour l'abonnement"""
+
+    def __init__(self, path=SERVICE_SOCKET, timeout=None):
+        self.path = path
+        self.timeout = timeout
+
+    def __connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+            uid = peer_uid(sock)
+        except OSError:
+            sock.close()
+            raise
+        if uid is not None and uid != os.getuid():
+            sock.close()
+            raise ServiceError(f"Le socket {self.path} est servi par un autre utilisateur (uid {uid})")
+        return sock
+
+    @staticmethod
+    def __request(stream, method, params):
+        stream.write(json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).encode() + b"\n")
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            raise ServiceError("Connexion au service fermée")
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            error_type = getattr(docker.errors, error.get("data", {}).get("type", ""), None)
+            if error_type in (docker.errors.NotFound, docker.errors.APIError, docker.errors.ImageNotFound):
+                raise error_type(error["message"])
+            raise ServiceError(error["message"])
+        return response["result"]
+
+    def call(self, method, **params):
+        with self.__connect() as sock, sock.makefile("rwb") as stream:
+            return self.__request(stream, method, params)
+
+    def subscribe(self, ui=False):
+        """Générateur : ("snapshot", état courant) puis (type, paramètres) pour chaque notification"""
+        with self.__connect() as sock, sock.makefile("rwb") as stream:
+            sock.settimeout(None)
+            yield "snapshot", self.__request(stream, "subscribe", {"ui": ui})
+            for line in stream:
+                message = json.loads(line)
+                yield message["method"], message.get("params", {})
+
+
+class CommandMirror:
+    """Copie locale des commandes du service, rechargée à chaque notification; les écritures passent par le service"""
+
+    def __init__(self, client):
+        self.client = client
+        self.lock = threading.Lock()
+        self.records = {}
+        self.by_network = {}
+
+    def reload(self):
+        records = self.client.call("commands")
+        by_network = defaultdict(set)
+        for cid, record in records.items():
+            for network in record["networks"]:
+                by_network[network].add(cid)
+        with self.lock:
+            self.records = records
+            self.by_network = by_network
+
+    def find(self, network):
+        with self.lock:
+            return sorted(self.by_network.get(network, ()))
+
+    def __contains__(self, cid):
+        with self.lock:
+            return cid in self.records
+
+    def get(self, cid, default=None):
+        with self.lock:
+            record = self.records.get(cid)
+            return record["command"] if record else default
+
+    def get_record(self, cid):
+        with self.lock:
+            return self.records.get(cid)
+
+    def items(self):
+        with self.lock:
+            return [(cid, record["command"]) for cid, record in self.records.items()]
+
+    def search_index(self):
+        with self.lock:
+            return {cid: command_search_text(cid, record) for cid, record in self.records.items()}
+
+
+class RemoteBackend(Backend):
+    """Même interface que DockerBackend, adossée à un service déjà lancé : un seul flux d'événements et un seul
+    cache côté service. Les flux lourds (logs, stats, exec) vont directement aux daemons."""
+
+    def __init__(self, client):
+        self.client = client
+        super().__init__(client.call("hosts"))
+        self.commands = CommandMirror(client)
+        self.stopped = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self.__follow, daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def __follow(self):
+        while not self.stopped.is_set():
+            try:
+                with self.listeners_lock:
+                    ui = any(is_ui for _, is_ui in self.listeners)
+                for kind, params in self.client.subscribe(ui=ui):
+                    if self.stopped.is_set():
+                        return
+                    self.__on_message(kind, params)
+            except Exception as e:
+                if self.stopped.is_set():
+                    return
+                logging.error(f"Service connection dropped: {e}")
+                self.notify("error", message=f"Service injoignable : {e}")
+            self.stopped.wait(RESYNC_DELAY)
+
+    def __on_message(self, kind, params):
+        if kind == "snapshot":
+            # (Re)connexion : le miroir est remplacé par l'état du service
+            rows = {cid: tuple(row) for cid, row in params["rows"].items()}
+            changed, removed = self.model.replace_all(rows, self.model.begin_sync())
+            self.host_errors = params["host_errors"]
+            self.commands.reload()
+            self.notify("rows", changed=changed, removed=removed, complete=not self.host_errors)
+            self.notify("hosts", errors=self.host_errors)
+            self.notify("commands")
+            return
+        if kind == "rows":
+            changed = {cid: tuple(row) for cid, row in params["changed"].items()}
+            for cid, row in changed.items():
+                self.model.upsert(cid, row)
+            for cid in params["removed"]:
+                self.model.remove(cid)
+            params = dict(params, changed=changed)
+        elif kind == "hosts":
+            self.host_errors = params["errors"]
+        elif kind == "commands":
+            self.commands.reload()
+        self.notify(kind, **params)
+
+    def refresh(self):
+        try:
+            self.client.call("refresh")
+        except (OSError, ServiceError) as e:
+            self.notify("error", message=f"Service injoignable : {e}")
+
+    def set_command(self, cid, cmd):
+        self.client.call("set_command", id=cid, command=cmd)
+
+    def container_action(self, action, cid):
+        self.client.call("action", action=action, id=cid)
+
+    def launch(self, key, cmd):
+        return self.client.call("launch", key=key, command=cmd)
+
+    def history(self, key="*", limit=50):
+        return self.client.call("history", key=key, limit=limit)
+
+    def list_groups(self):
+        return self.client.call("groups")
+
+    def set_group(self, name, keys):
+        self.client.call("set_group", name=name, keys=keys)
+
+    def launch_group(self, name):
+        return self.client.call("launch_group", name=name)
+
+    def disk_usage(self, host_name=None, max_age=DISK_USAGE_TTL):
+        return self.client.call("disk_usage", host=host_name, max_age=max_age)
+
+    def prune(self, host_name, kind):
+        return self.client.call("prune", host=host_name, kind=kind)
+
+    def remove_resource(self, host_name, kind, rid):
+        self.client.call("remove_resource", host=host_name, kind=kind, id=rid)
 
 
 # noinspection PyShadowingNames,PyUnresolvedReferences,PyMethodMayBeStatic,PyTypeChecker,PyUnusedLocal
 class DockerManagerApp:
-    def __init__(self, root):
+    def __init__(self, root, backend, exit_after_paint=False):
         self.root = root
+        self.backend = backend  # DockerBackend local ou RemoteBackend vers le service
+        self.exit_after_paint = exit_after_paint  # Benchmark de démarrage : quitter après le premier affichage
         self.root.title("Docker Manager")
-        self.root.geometry("700x500")
+        self.root.geometry("1000x500")
         self.root.resizable(False, False)
-        self.selected_line = None
+        self.selected_command = None  # (clé, commande) ciblée par le menu contextuel
         self.edit_popup_open = False  # Variable pour suivre l'état de la popup
         try:
             self.root.iconphoto(True, tk.PhotoImage(file="docker-manager.png"))
@@ -36,19 +2794,51 @@ class DockerManagerApp:
         self.status_bar = ttk.Label(self.root, text="Prêt", relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
-        self.client = self.get_client()
+        self.host_errors = {}  # Hôte -> erreur affichée pour le dernier listing
+        self.model = backend.model
+        self.commands = backend.commands
+        self.tree_items = {}  # ID complet du conteneur -> item du Treeview
+        self.tree_rows = {}  # ID complet du conteneur -> valeurs actuellement affichées
+        self.tree_pending = {}  # Lignes en attente d'application (None = suppression)
+        self.tree_job = None
+        self.tree_refreshed = False
+        self.row_progress = {}  # ID complet -> opération en cours, affichée à la place du statut
+        self.row_stats = {}  # ID complet -> colonnes CPU, mémoire, réseau et disque du dernier échantillon
+        self.stale_ids = set()  # Lignes de l'instantané pas encore confirmées par leur daemon
+        self.shells_tracked = False  # Images de toutes les lignes confiées au cache des shells après un listing complet
+        self.perf_panel = None
+        self.group_view = None
+        self.disk_view = None
+        self.executor = ActionExecutor(self.root)
+        self.shell_cache = ShellCache(backend.client_for, self.executor.pool)
 
         # Ajout de la colonne "Ports" dans le Treeview
-        self.tree = ttk.Treeview(self.root, columns=("ID", "Name", "Status", "Ports"), show="headings", height=4, selectmode="browse")
+        self.tree = ttk.Treeview(self.root, columns=("Host", "ID", "Name", "Status", "Ports", "CPU", "Mem", "NetIO", "BlockIO"),
+                                 show="headings", height=4, selectmode="extended")
+        self.tree.heading("Host", text="Hôte")
         self.tree.heading("ID", text="ID")
         self.tree.heading("Name", text="Nom")
         self.tree.heading("Status", text="Statut")
         self.tree.heading("Ports", text="Ports")
+        self.tree.heading("CPU", text="CPU")
+        self.tree.heading("Mem", text="Mémoire")
+        self.tree.heading("NetIO", text="Réseau E/S")
+        self.tree.heading("BlockIO", text="Disque E/S")
+        self.tree.column("Host", width=80)
         self.tree.column("ID", width=80)
         self.tree.column("Name", width=150)
         self.tree.column("Status", width=70)
         self.tree.column("Ports", width=150)
+        self.tree.column("CPU", width=55, anchor=tk.E)
+        self.tree.column("Mem", width=75, anchor=tk.E)
+        self.tree.column("NetIO", width=130, anchor=tk.E)
+        self.tree.column("BlockIO", width=130, anchor=tk.E)
+        if len(backend.hosts.hosts) == 1:
+            self.tree.config(displaycolumns=self.tree["columns"][1:])  # Colonne Hôte inutile avec un seul daemon
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.tree.tag_configure('running', foreground='green')
+        self.tree.tag_configure('stopped', foreground='red')
+        self.tree.tag_configure('stale', foreground='grey')
 
         # Configuration du style pour le Treeview
         style = ttk.Style()
@@ -71,7 +2861,11 @@ class DockerManagerApp:
         self.shell_btn.pack(side=tk.LEFT, padx=2)
         self.logs_btn = ttk.Button(btn_frame, text="Logs", command=self.open_logs)
         self.logs_btn.pack(side=tk.LEFT, padx=2)
-        ttk.Button(btn_frame, text="Quitter", command=self.root.quit)
+        ttk.Button(btn_frame, text="Groupes", command=self.open_groups).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Ressources", command=self.open_disk_usage).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Historique", command=self.open_history).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Performances", command=self.toggle_perf_panel).pack(side=tk.LEFT, padx=2)
+        ttk.Button(btn_frame, text="Quitter", command=self.quit)
 
         self.toggle_btn.config(state=tk.DISABLED)
         self.delete_btn.config(state=tk.DISABLED)
@@ -82,32 +2876,99 @@ class DockerManagerApp:
         self.tree.bind('<<TreeviewSelect>>', self.check_selection)
         self.tree.bind('<Double-1>', lambda e: self.open_shell())  # Ajout du double-clic
 
-        self.launch_cmds_text = tk.Text(self.root, height=12, wrap=tk.WORD, cursor="hand2")
-        self.launch_cmds_text.pack(fill=tk.X, padx=5, pady=5)
-        self.launch_cmds_text.config(state=tk.DISABLED)
-        self.launch_cmds_text.tag_configure("highlight", background="lightblue")
-        self.launch_cmds_text.bind('<Motion>', self.highlight_line)
-        self.launch_cmds_text.bind('<Leave>', self.clear_highlight)
-        # self.launch_cmds_text.bind('<Button-1>', self.launch_container_from_cmd)
-        self.launch_cmds_text.bind('<Double-1>', self.launch_container_from_cmd)
-
         # Ajout du menu contextuel (clic droit)
         self.context_menu = tk.Menu(self.root, tearoff=0)
-        self.launch_cmds_text.bind('<Button-3>', self.show_context_menu)  # Clic droit sur la liste
+        self.commands_view = CommandListView(self.root, 12, self.launch_container_from_cmd, self.show_context_menu)
 
         # Binding global pour supprimer "Modifier" avec un clic gauche n'importe où
         self.root.bind('<Button-1>', self.remove_modify_option)
 
-        self.launch_cmds_text.tag_configure("even", background="#F4CFDF")
-        self.launch_cmds_text.tag_configure("odd", background="#B6D8F2")
-
         self.root.bind('<F5>', lambda e: self.refresh_list())
-        self.root.bind('<Control-q>', lambda e: self.root.quit())
+        self.root.bind('<F12>', lambda e: self.toggle_perf_panel())
+        self.root.bind('<Control-q>', lambda e: self.quit())
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
 
-        self.commands = self.load_commands()
-        self.refresh_list()
         self.update_commands_text()
 
+        # Les changements du backend arrivent hors du thread Tk
+        self.status_bar.config(text="Chargement...")
+        if backend.snapshot_time is not None:
+            # Dernière liste connue affichée tout de suite, marquée comme non actualisée jusqu'à la réconciliation
+            rows = self.model.snapshot()
+            self.stale_ids = set(rows)
+            self.__apply_changes(rows, [])
+            saved = time.strftime("%d/%m %H:%M", time.localtime(backend.snapshot_time))
+            self.status_bar.config(text=f"Liste du {saved} (non actualisée), connexion à Docker...")
+        self.root.after_idle(self.__on_first_paint)
+        backend.add_listener(lambda kind, params: self.root.after(0, self.on_backend_event, kind, params), ui=True)
+        self.stats_sampler = StatsSampler(backend.client_for, self.model.running_ids,
+                                          lambda results, running: self.root.after(0, self.__apply_stats, results, running))
+        self.stats_sampler.start()
+
+    def quit(self):
+        self.stats_sampler.stop()
+        self.shell_cache.shutdown()
+        self.executor.shutdown()
+        self.backend.stop()
+        self.root.quit()
+
+    def __on_first_paint(self):
+        self.root.update_idletasks()
+        elapsed = time.perf_counter() - STARTED
+        logging.info(f"First paint after {elapsed * 1000:.0f} ms")
+        if self.exit_after_paint:
+            print(f"first-paint {elapsed:.4f}", flush=True)
+            self.quit()
+
+    def on_backend_event(self, kind, params):
+        """Applique sur le thread Tk un changement diffusé par le backend"""
+        if kind == "rows":
+            changed = params["changed"]
+            self.stale_ids.difference_update(changed, params["removed"])
+            tracked = changed
+            if params["complete"] and not self.shells_tracked:
+                # Les lignes de l'instantané inchangées ne figurent pas dans changed : toutes sont suivies
+                tracked = self.model.snapshot()
+                self.shells_tracked = True
+            self.__track_shells(tracked, params["removed"], params["complete"])
+            if params["complete"]:
+                self.tree_refreshed = True
+            self.__apply_changes(changed, params["removed"])
+        elif kind == "hosts":
+            if self.stale_ids:
+                # Les hôtes qui ont répondu ont confirmé leurs lignes de l'instantané restées identiques
+                confirmed = {}
+                for cid in list(self.stale_ids):
+                    row = self.model.get(cid)
+                    if row is not None and row[5] not in params["errors"]:
+                        self.stale_ids.discard(cid)
+                        confirmed[cid] = row
+                self.__track_shells(confirmed)
+                self.__apply_changes(confirmed, [])
+            self.__show_host_errors(params["errors"])
+        elif kind == "commands":
+            self.update_commands_text()
+        elif kind == "group":
+            status = f"Groupe {params['name']} : {params['done']}/{params['total']}"
+            self.status_bar.config(text=status if params["error"] is None else f"{status} - {params['item']} : {params['error']}")
+            if self.group_view is not None and self.group_view.window.winfo_exists():
+                self.group_view.show_progress(params)
+        elif kind == "groups":
+            if self.group_view is not None and self.group_view.window.winfo_exists():
+                self.group_view.reload()
+        elif kind == "error":
+            self.status_bar.config(text=f"Erreur: {params['message']}")
+        elif kind == "show":
+            # Une autre invocation demande la fenêtre existante
+            self.root.deiconify()
+            self.root.lift()
+            self.root.focus_force()
+
+    def __track_shells(self, rows, removed=(), complete=False):
+        """Confie au cache des shells l'image des lignes et anticipe la détection pour celles en cours d'exécution"""
+        self.shell_cache.track({cid: row[6] for cid, row in rows.items()}, removed, complete)
+        self.shell_cache.prewarm([cid for cid, row in rows.items() if row[4]])
+
     def check_selection(self, event):
         selected = self.tree.selection()
         state = tk.NORMAL if selected else tk.DISABLED
@@ -116,55 +2977,13 @@ class DockerManagerApp:
         self.shell_btn.config(state=state)
         self.logs_btn.config(state=state)
 
-    def load_commands(self):
-        try:
-            if os.path.exists(COMMAND_FILE):
-                with open(COMMAND_FILE, 'r') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            logging.error(f"Erreur lors du chargement des commandes: {e}")
-            return {}
-
-    def save_commands(self):
-        try:
-            reversed_dict = {}
-            for cid, cmd in self.commands.items():
-                reversed_dict[cmd] = cid
-            deduplicated_commands = {cid: cmd for cmd, cid in reversed_dict.items()}
-            with open(COMMAND_FILE, 'w') as f:
-                json.dump(deduplicated_commands, f, indent=2)
-            self.update_commands_text()
-        except Exception as e:
-            logging.error(f"Erreur lors de la sauvegarde des commandes: {e}")
-
+    @timings.timed("tk commands panel")
     def update_commands_text(self):
-        cmd_dict = {}
-        for key, cmd in self.commands.items():
-            cmd_dict[cmd] = key
-
-        self.launch_cmds_text.config(state=tk.NORMAL)
-        self.launch_cmds_text.delete(1.0, tk.END)
-        for i, (cmd, key) in enumerate(cmd_dict.items()):
-            line = f"{key}: {cmd}\n"
-            tag = "even" if i % 2 == 0 else "odd"
-            self.launch_cmds_text.insert(tk.END, line, tag)
-        self.launch_cmds_text.config(state=tk.DISABLED)
-
-    def highlight_line(self, event):
-        self.launch_cmds_text.tag_remove("highlight", "1.0", tk.END)
-        line_num = self.launch_cmds_text.index("@%d,%d" % (event.x, event.y)).split('.')[0]
-        start = f"{line_num}.0"
-        end = f"{line_num}.end"
-        self.launch_cmds_text.tag_add("highlight", start, end)
-
-    def clear_highlight(self, event):
-        self.launch_cmds_text.tag_remove("highlight", "1.0", tk.END)
-
-    def show_context_menu(self, event):
+        self.commands_view.set_entries(self.commands.items(), self.commands.search_index())
+
+    def show_context_menu(self, event, key, cmd):
         """Affiche le menu contextuel au clic droit sur la liste et réinitialise 'Modifier' si nécessaire"""
-        line_num = self.launch_cmds_text.index("@%d,%d" % (event.x, event.y)).split('.')[0]
-        self.selected_line = line_num  # Stocker la ligne sélectionnée
+        self.selected_command = (key, cmd)  # Stocker la commande sélectionnée
 
         # Vérifie si "Modifier" existe, sinon le recrée
         try:
@@ -172,6 +2991,7 @@ class DockerManagerApp:
         except tk.TclError:
             self.context_menu.delete(0, tk.END)  # Nettoie le menu
             self.context_menu.add_command(label="Modifier", command=self.edit_command)  # Recrée "Modifier"
+            self.context_menu.add_command(label="Ajouter au groupe...", command=self.add_to_group)
 
         self.context_menu.post(event.x_root, event.y_root)
 
@@ -238,8 +3058,7 @@ class DockerManagerApp:
     def save_popup_command(self, popup, entry, cid):
         new_cmd = entry.get("1.0", tk.END).strip()
         if new_cmd and new_cmd != self.commands.get(cid, ""):
-            self.commands[cid] = new_cmd
-            self.save_commands()
+            self.backend.set_command(cid, new_cmd)
             self.status_bar.config(text=f"Commande pour {cid} mise à jour")
             logging.info(f"Commande mise à jour pour {cid}: {new_cmd}")
         self.on_popup_close(popup)
@@ -251,238 +3070,283 @@ class DockerManagerApp:
 
     def edit_command(self):
         """Modifie la commande sélectionnée et sauvegarde"""
-        if not hasattr(self, 'selected_line'):
+        if not self.selected_command:
             return
+        cid, current_cmd = self.selected_command
+        # Nouvelle popup personnalisée
+        self.create_edit_popup("Modifier Commande", "Entrez la nouvelle commande:", current_cmd, cid)
 
-        line_num = self.selected_line
-        line = self.launch_cmds_text.get(f"{line_num}.0", f"{line_num}.end").strip()
-        if not line:
+    def add_to_group(self):
+        """Ajoute la commande du menu contextuel à un groupe, créé au besoin"""
+        if not self.selected_command:
             return
-
+        key, _ = self.selected_command
         try:
-            cid, current_cmd = line.split(":", 1)
-            cid = cid.strip()
-            current_cmd = current_cmd.strip()
-
-            # Nouvelle popup personnalisée
-            self.create_edit_popup("Modifier Commande", "Entrez la nouvelle commande:", current_cmd, cid)
-        except ValueError:
-            self.status_bar.config(text="Erreur: Ligne mal formée")
-            logging.error(f"Ligne mal formée: {line}")
-
-    def launch_container_from_cmd(self, event):
-        line_num = self.launch_cmds_text.index("@%d,%d" % (event.x, event.y)).split('.')[0]
-        line = self.launch_cmds_text.get(f"{line_num}.0", f"{line_num}.end").strip()
-        if line:
-            try:
-                cmd = line.split(":", 1)[1].strip()
-                cmd_parts = cmd.split()
-                container_name = None
-                for i, part in enumerate(cmd_parts):
-                    if part == "--name" and i + 1 < len(cmd_parts):
-                        container_name = cmd_parts[i + 1]
-                        break
-
-                if container_name:
-                    try:
-                        existing_container = self.client.containers.get(container_name)
-                        logging.info(f"Conteneur existant '{container_name}' trouvé, suppression en cours...")
-                        existing_container.remove(force=True)
-                        self.status_bar.config(text=f"Conteneur existant {container_name} supprimé avant relance")
-                    except docker.errors.NotFound:
-                        pass
-
-                subprocess.Popen(cmd, shell=True)
-                self.status_bar.config(text=f"Lancement de: {cmd}")
+            groups = self.backend.list_groups()
+        except Exception as e:
+            self.status_bar.config(text=f"Erreur: {e}")
+            return
+        record = self.commands.get_record(key) or parse_run_command(self.selected_command[1])
+        # Suggestion : le groupe qui partage déjà un réseau avec la commande, sinon son premier réseau
+        networks = sorted(command_networks(record))
+        neighbours = {other for network in networks for other in self.commands.find(network)}
+        suggestion = next((name for name, keys in groups.items() if neighbours.intersection(keys)), next(iter(networks), ""))
+        name = simpledialog.askstring("Groupe", "Nom du groupe :", initialvalue=suggestion, parent=self.root)
+        if not name:
+            return
+        self.backend.set_group(name, groups.get(name, []) + [key])
+        self.status_bar.config(text=f"{record['name'] or key} ajouté au groupe {name}")
+
+    def open_groups(self):
+        if self.group_view is not None and self.group_view.window.winfo_exists():
+            self.group_view.window.lift()
+            return
+        self.group_view = GroupView(self.root, self.executor.pool, self.backend, self.launch_group)
+
+    def open_disk_usage(self):
+        if self.disk_view is not None and self.disk_view.window.winfo_exists():
+            self.disk_view.window.lift()
+            return
+        self.disk_view = DiskUsageView(self.root, self.executor, self.backend, lambda text: self.status_bar.config(text=text))
+
+    def launch_group(self, name):
+        """Lance un groupe hors du thread Tk; l'avancement arrive par les notifications "group" du backend"""
+        outcome = {}
+
+        def on_done(results):
+            error = results[name]
+            if error is not None:
+                self.status_bar.config(text=f"Erreur de lancement du groupe {name}: {error}")
+                logging.error(f"Erreur lors du lancement du groupe {name}: {error}")
+            elif outcome["errors"]:
+                self.status_bar.config(text=f"Groupe {name} : {len(outcome['launched'])} lancé(s), {len(outcome['errors'])} en échec")
+            else:
+                self.status_bar.config(text=f"Groupe {name} lancé ({len(outcome['launched'])} conteneurs)")
+
+        def launch():
+            outcome.update(self.backend.launch_group(name))
+
+        self.status_bar.config(text=f"Lancement du groupe {name}...")
+        self.executor.run_bulk([(name, launch)], lambda key, error: None, on_done)
+
+    def launch_container_from_cmd(self, key, cmd):
+        launched = {}
+
+        def on_done(results):
+            error = results[cmd]
+            if error is None:
+                cid = launched["id"]
+                self.status_bar.config(text=f"Container {cid[:12]} lancé sur {launched['host']}" if cid else f"Lancé via la CLI: {cmd}")
                 logging.info(f"Lancement de la commande: {cmd}")
-                self.root.after(1000, self.refresh_list)
-            except IndexError:
-                self.status_bar.config(text="Erreur: Commande mal formée")
-                logging.error(f"Commande mal formée: {line}")
-            except docker.errors.APIError as e:
-                self.status_bar.config(text=f"Erreur API Docker: {e}")
-                logging.error(f"Erreur API lors du lancement: {e}")
-            except Exception as e:
-                self.status_bar.config(text=f"Erreur de lancement: {e}")
-                logging.error(f"Erreur lors du lancement: {e}")
+            elif isinstance(error, docker.errors.APIError):
+                self.status_bar.config(text=f"Erreur API Docker: {error}")
+                logging.error(f"Erreur API lors du lancement: {error}")
+            else:
+                self.status_bar.config(text=f"Erreur de lancement: {error}")
+                logging.error(f"Erreur lors du lancement: {error}")
 
-    def get_client(self):
-        try:
-            client = docker.from_env()
-            self.status_bar.config(text="Connexion à Docker réussie")
-            logging.info("Connected to Docker")
-            return client
-        except docker.errors.DockerException as e:
-            self.status_bar.config(text=f"Erreur: {e}")
-            logging.error(f"Docker connection failed: {e}")
-            sys.exit(1)
+        def launch():
+            launched.update(self.backend.launch(key, cmd))
+
+        self.status_bar.config(text=f"Lancement de: {cmd}")
+        self.executor.run_bulk([(cmd, launch)], lambda key, error: None, on_done)
 
     def refresh_list(self):
+        """Resynchronisation complète manuelle (F5), le flux d'événements s'occupe du reste"""
         self.status_bar.config(text="Chargement...")
-        self.root.update()
-
-        def refresh_in_background():
-            containers = sorted(self.client.containers.list(all=True), key=lambda c: c.name)
-            port_data = []
-            for container in containers:
-                status = "Running" if container.status == "running" else "Stopped"
-                ports = container.attrs.get('NetworkSettings', {}).get('Ports', {})
-                port_list = []
-                for container_port, host_bindings in ports.items():
-                    if host_bindings:
-                        for binding in host_bindings:
-                            host_port = binding.get('HostPort', '')
-                            if host_port:
-                                port_list.append(f"{host_port}->{container_port}")
-                ports_str = ", ".join(port_list) if port_list else "N/A"
-                port_data.append((container.short_id, container.name, status, ports_str, status == "Running"))
-                if container.short_id not in self.commands:
-                    cmd = self.get_container_command(container)
-                    if cmd:
-                        self.commands[container.short_id] = cmd
-                        self.save_commands()
-
-            self.root.after(0, lambda: self.__update_tree(port_data))
-
-        threading.Thread(target=refresh_in_background, daemon=True).start()
-
-    def __update_tree(self, port_data):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for short_id, name, status, ports_str, is_running in port_data:
-            item = self.tree.insert("", tk.END, values=(short_id, name, status, ports_str))
-            self.tree.item(item, tags=('running' if is_running else 'stopped',))
-        self.tree.tag_configure('running', foreground='green')
-        self.tree.tag_configure('stopped', foreground='red')
-        self.status_bar.config(text="Liste actualisée")
-        logging.info("Container list refreshed")
+        self.backend.refresh()
+
+    def __show_host_errors(self, errors):
+        """Signale dans la barre d'état les hôtes qui n'ont pas répondu au dernier listing"""
+        if errors:
+            self.status_bar.config(text="Hôte(s) indisponible(s) : " + ", ".join(f"{host} ({error})" for host, error in errors.items()))
+        elif self.host_errors:
+            self.status_bar.config(text="Tous les hôtes Docker répondent")
+        self.host_errors = errors
+
+    def __apply_changes(self, changed, removed):
+        """Met en file les lignes modifiées ou supprimées, appliquées par paquets sur plusieurs ticks"""
+        for cid in removed:
+            self.tree_pending[cid] = None
+        self.tree_pending.update(changed)
+        if self.tree_job is None:
+            self.tree_job = self.root.after_idle(self.__flush_tree)
+
+    @timings.timed("tk tree flush")
+    def __flush_tree(self):
+        """Applique au plus TREE_CHUNK_SIZE insertions, suppressions ou mises à jour en place"""
+        self.tree_job = None
+        order = self.model.sorted_ids()
+        position = {cid: i for i, cid in enumerate(order)}
+        # Suppressions d'abord, puis lignes dans l'ordre d'affichage pour que les index d'insertion soient justes
+        batch = sorted(self.tree_pending, key=lambda cid: position.get(cid, -1))[:TREE_CHUNK_SIZE]
+        for cid in batch:
+            row = self.tree_pending.pop(cid)
+            item = self.tree_items.get(cid)
+            if row is None:
+                if item is not None:
+                    self.tree.delete(item)
+                    del self.tree_items[cid]
+                    del self.tree_rows[cid]
+                continue
+            short_id, name, status, ports_str, is_running, host, _image = row
+            stale = cid in self.stale_ids
+            status = self.row_progress.get(cid, f"{status} (cache)" if stale else status)
+            values = (host, short_id, name, status, ports_str, *self.row_stats.get(cid, ("", "", "", "")))
+            if item is not None and self.tree_rows.get(cid) == values:
+                continue
+            tags = ('stale',) if stale else ('running' if is_running else 'stopped',)
+            index = position.get(cid, tk.END)
+            if item is None:
+                self.tree_items[cid] = self.tree.insert("", index, values=values, tags=tags)
+            else:
+                self.tree.item(item, values=values, tags=tags)
+                if self.tree_rows[cid][2] != name:
+                    self.tree.move(item, "", index)  # Un renommage change l'ordre
+            self.tree_rows[cid] = values
 
-    def get_container_command(self, container):
-        try:
-            container_info = self.client.api.inspect_container(container.id)
-            config = container_info.get('Config', {})
-            host_config = container_info.get('HostConfig', {})
-            network_settings = container_info.get('NetworkSettings', {})
-            name = container_info.get('Name', '').lstrip('/')
-            image = config.get('Image', '')
-            cmd = config.get('Cmd', [])
-
-            command_parts = ["docker", "run"]
-            if host_config.get('AutoRemove', False):
-                command_parts.append("--rm")
-            if name:
-                command_parts.append(f"--name {name}")
-            ports = network_settings.get('Ports', {}) or host_config.get('PortBindings', {})
-            for container_port, host_bindings in ports.items():
-                if host_bindings:
-                    for binding in host_bindings:
-                        host_ip = binding.get('HostIp', '')
-                        host_port = binding.get('HostPort', '')
-                        port_proto = container_port.split('/')
-                        container_port_num = port_proto[0]
-                        if host_ip and host_port:
-                            port_mapping = f"{host_ip}:{host_port}:{container_port_num}"
-                        elif host_port:
-                            port_mapping = f"{host_port}:{container_port_num}"
-                        else:
-                            port_mapping = container_port_num
-                        command_parts.append(f"-p {port_mapping}")
-            mounts = host_config.get('Binds', []) or []
-            for mount in mounts:
-                if mount:
-                    command_parts.append(f"-v {mount}")
-            networks = network_settings.get('Networks', {})
-            for network_name in networks.keys():
-                if network_name != "bridge":
-                    command_parts.append(f"--network {network_name}")
-            command_parts.append(image)
-            if cmd:
-                command_parts.append(" ".join(cmd))
-            return " ".join(command_parts).strip()
-        except Exception as e:
-            logging.error(f"Erreur lors de la récupération de la commande pour {container.short_id}: {e}")
-            return None
+        if self.tree_pending:
+            self.tree_job = self.root.after(1, self.__flush_tree)
+            return
 
-    def get_selected_container(self):
-        selected = self.tree.selection()
-        if not selected:
+        # Filet de sécurité : rétablit l'ordre par nom en un seul appel si des événements se sont croisés
+        expected = [self.tree_items[cid] for cid in order if cid in self.tree_items]
+        if list(self.tree.get_children()) != expected:
+            self.tree.set_children("", *expected)
+        if self.tree_refreshed:
+            self.tree_refreshed = False
+            self.status_bar.config(text="Liste actualisée")
+            logging.info("Container list refreshed")
+
+    @timings.timed("tk stats")
+    def __apply_stats(self, results, running):
+        """Un seul passage de réconciliation du Treeview par tick d'échantillonnage"""
+        changed_ids = [cid for cid in self.row_stats if cid not in running]
+        for cid in changed_ids:
+            del self.row_stats[cid]
+        self.row_stats.update(results)
+        changed = {}
+        for cid in changed_ids + list(results):
+            row = self.model.get(cid)
+            if row is not None:
+                changed[cid] = row
+        if changed:
+            self.__apply_changes(changed, [])
+
+    def get_selected_containers(self):
+        """IDs complets des conteneurs sélectionnés (sélection multiple)"""
+        items = {item: cid for cid, item in self.tree_items.items()}
+        cids = [items[item] for item in self.tree.selection() if item in items]
+        if not cids:
             self.status_bar.config(text="Aucun container sélectionné")
-            return None
-        item = self.tree.item(selected[0])
-        return item["values"][0]
+        return cids
+
+    def __set_progress(self, cid, label):
+        """Affiche (ou retire) l'opération en cours dans la colonne Statut d'une ligne"""
+        if label is None:
+            self.row_progress.pop(cid, None)
+        else:
+            self.row_progress[cid] = label
+        row = self.model.get(cid)
+        if row is not None:
+            self.__apply_changes({cid: row}, [])
+
+    def run_container_action(self, label, actions):
+        """Exécute dans le pool une action (fonction, progression, texte de fin, verbe du log) par conteneur,
+        avec progression par ligne et bilan dans la barre d'état"""
+        for cid, (fn, progress, done_text, verb) in actions.items():
+            self.__set_progress(cid, progress)
+        self.status_bar.config(text=f"{label} ({len(actions)} container(s))")
+
+        def on_progress(cid, error):
+            self.__set_progress(cid, None)
+            verb = actions[cid][3]
+            if isinstance(error, docker.errors.NotFound):
+                logging.warning(f"Container {cid[:12]} not found")
+            elif error is not None:
+                logging.error(f"Failed to {verb.lower()} container {cid[:12]}: {error}")
+            else:
+                logging.info(f"{verb} container {cid[:12]}")
+
+        def on_done(results):
+            errors = [error for error in results.values() if error is not None]
+            if any(isinstance(error, docker.errors.NotFound) for error in errors):
+                self.refresh_list()
+            if len(results) == 1:
+                cid, error = next(iter(results.items()))
+                if isinstance(error, docker.errors.NotFound):
+                    self.status_bar.config(text=f"Container {cid[:12]} introuvable")
+                elif error is not None:
+                    self.status_bar.config(text=f"Erreur: {error}")
+                else:
+                    self.status_bar.config(text=f"Container {cid[:12]} {actions[cid][2]}")
+            else:
+                text = f"{label} terminé : {len(results) - len(errors)}/{len(results)} containers"
+                self.status_bar.config(text=text + (f", {len(errors)} erreur(s)" if errors else ""))
+
+        tasks = [(cid, lambda cid=cid, fn=action[0]: fn(cid)) for cid, action in actions.items()]
+        self.executor.run_bulk(tasks, on_progress, on_done)
 
     def toggle_container(self):
-        container_id = self.get_selected_container()
-        if not container_id:
+        cids = self.get_selected_containers()
+        if not cids:
             return
-        try:
-            container = self.client.containers.get(container_id)
-            if container.status == "running":
-                container.stop()
-                self.status_bar.config(text=f"Container {container_id} arrêté")
-                logging.info(f"Stopped container {container_id}")
+        actions = {}
+        for cid in cids:
+            row = self.model.get(cid)
+            if row and row[4]:
+                actions[cid] = (lambda cid: self.backend.container_action("stop", cid), "Arrêt...", "arrêté", "Stopped")
             else:
-                container.start()
-                self.status_bar.config(text=f"Container {container_id} démarré")
-                logging.info(f"Started container {container_id}")
-            self.refresh_list()
-        except docker.errors.NotFound:
-            self.status_bar.config(text=f"Container {container_id} introuvable")
-            logging.warning(f"Container {container_id} not found")
-            self.refresh_list()
-        except docker.errors.APIError as e:
-            self.status_bar.config(text=f"Erreur: {e}")
-            logging.error(f"Failed to toggle container {container_id}: {e}")
+                actions[cid] = (lambda cid: self.backend.container_action("start", cid), "Démarrage...", "démarré", "Started")
+        self.run_container_action("Démarrage/Arrêt", actions)
 
     def delete_container(self):
-        container_id = self.get_selected_container()
-        if not container_id:
+        cids = self.get_selected_containers()
+        if not cids:
             return
-        try:
-            container = self.client.containers.get(container_id)
-            container.remove(force=True)
-            self.status_bar.config(text=f"Container {container_id} supprimé")
-            logging.info(f"Deleted container {container_id}")
-            self.refresh_list()
-        except docker.errors.NotFound:
-            self.status_bar.config(text=f"Container {container_id} introuvable")
-            logging.warning(f"Container {container_id} not found")
-            self.refresh_list()
-        except docker.errors.APIError as e:
-            self.status_bar.config(text=f"Erreur: {e}")
-            logging.error(f"Failed to delete container {container_id}: {e}")
+        remove = lambda cid: self.backend.container_action("remove", cid)
+        self.run_container_action("Suppression", {cid: (remove, "Suppression...", "supprimé", "Deleted") for cid in cids})
 
     def open_shell(self):
-        container_id = self.get_selected_container()
-        if not container_id:
+        cids = self.get_selected_containers()
+        if not cids:
+            return
+        cid = cids[0]
+        row = self.model.get(cid)
+        if not row or not row[4]:
+            self.status_bar.config(text="Container non démarré")
+            return
+        shell = self.shell_cache.get(cid)
+        if shell is not None:
+            self.__spawn_shell(cid, shell)  # Shell déjà connu pour cette image : ouverture immédiate
+            return
+        self.status_bar.config(text=f"Détection du shell pour {cid[:12]}...")
+        self.shell_cache.detect(cid).add_done_callback(lambda future: self.root.after(0, self.__on_shell_detected, cid, future))
+
+    def __on_shell_detected(self, cid, future):
+        error = future.exception()
+        if isinstance(error, docker.errors.NotFound):
+            self.status_bar.config(text=f"Container {cid[:12]} introuvable")
+            logging.warning(f"Container {cid[:12]} not found")
+            self.refresh_list()
+        elif error is not None:
+            self.status_bar.config(text=f"Erreur: {error}")
+            logging.error(f"Failed to open shell in {cid[:12]}: {error}")
+        else:
+            self.__spawn_shell(cid, future.result())
+
+    def __spawn_shell(self, cid, shell):
+        container_id = cid[:12]
+        if not shell:
+            self.status_bar.config(text="Aucun shell trouvé")
+            logging.error(f"No shell available in container {container_id}")
             return
         try:
-            container = self.client.containers.get(container_id)
-            if container.status != "running":
-                self.status_bar.config(text="Container non démarré")
-                return
-            shells = ["bash", "sh"]
-            shell = None
-            for s in shells:
-                try:
-                    result = container.exec_run(f"{s} -c 'exit 0'", stdout=False, stderr=True)
-                    if result.exit_code == 0:
-                        shell = s
-                        break
-                except docker.errors.APIError:
-                    continue
-            if not shell:
-                self.status_bar.config(text="Aucun shell trouvé")
-                logging.error(f"No shell available in container {container_id}")
-                return
-            cmd = ["xterm", "-e", f"docker exec -it {container_id} {shell}"]
+            docker_cmd = " ".join(["docker", *self.backend.host_of(cid).cli_args(), "exec", "-it", container_id, shell])
+            cmd = ["xterm", "-e", docker_cmd]
             subprocess.Popen(cmd)
             self.status_bar.config(text=f"Shell ({shell}) ouvert pour {container_id}")
             logging.info(f"Opened {shell} in container {container_id}")
-        except docker.errors.NotFound:
-            self.status_bar.config(text=f"Container {container_id} introuvable")
-            logging.warning(f"Container {container_id} not found")
-            self.refresh_list()
         except FileNotFoundError:
             self.status_bar.config(text="xterm non trouvé")
             logging.error("xterm not found")
@@ -490,54 +3354,118 @@ class DockerManagerApp:
             self.status_bar.config(text=f"Erreur: {e}")
             logging.error(f"Failed to open shell in {container_id}: {e}")
 
+    def toggle_perf_panel(self):
+        if self.perf_panel is not None and self.perf_panel.window.winfo_exists():
+            self.perf_panel.close()
+            self.perf_panel = None
+        else:
+            self.perf_panel = PerfPanel(self.root, lambda text: self.status_bar.config(text=text))
+
+    def open_history(self):
+        """Historique du conteneur sélectionné (par nom, pour suivre ses recréations), sinon de toutes les opérations"""
+        cids = self.get_selected_containers()
+        row = self.model.get(cids[0]) if cids else None
+        if row is not None:
+            key, title = f"name:{row[1]}", f"Historique - {row[1]}"
+        else:
+            key, title = "*", "Historique des opérations"
+        HistoryView(self.root, self.executor.pool, lambda: self.backend.history(key), title)
+
     def open_logs(self):
-        container_id = self.get_selected_container()
-        if not container_id:
+        cids = self.get_selected_containers()
+        if not cids:
             return
+        cid = cids[0]
+        row = self.model.get(cid)
+        LogViewer(self.root, self.backend.client_for, cid, row[1] if row else cid[:12])
+        self.status_bar.config(text=f"Logs ouverts pour {cid[:12]}")
+        logging.info(f"Opened logs for container {cid[:12]}")
+
+
+def connect_service(client, method, **params):
+    """Appel au service en laissant au processus qui vient de prendre le verrou le temps d'ouvrir son socket"""
+    deadline = time.monotonic() + SERVICE_CONNECT_TIMEOUT
+    while True:
         try:
-            container = self.client.containers.get(container_id)
-            logs = container.logs(tail=1000).decode('utf-8')
-            cmd = ["xterm", "-e", f"docker logs --follow {container_id}"]
-            subprocess.Popen(cmd)
-            self.status_bar.config(text=f"Logs ouverts pour {container_id}")
-            logging.info(f"Opened logs for container {container_id}")
-        except docker.errors.NotFound:
-            self.status_bar.config(text=f"Container {container_id} introuvable")
-            logging.warning(f"Container {container_id} not found")
-            self.refresh_list()
-        except FileNotFoundError:
-            self.status_bar.config(text="xterm non trouvé")
-            logging.error("xterm not found")
-        except Exception as e:
-            self.status_bar.config(text=f"Erreur: {e}")
-            logging.error(f"Failed to open logs for {container_id}: {e}")
+            return client.call(method, **params)
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+
+
+def run_cli(client, args):
+    """Modes script : interrogent le service en cours, sans connexion propre à Docker"""
+    try:
+        if args.metrics:
+            metrics = client.call("metrics", format=args.metrics)
+            print(metrics.rstrip("\n") if args.metrics == "prometheus" else json.dumps(metrics, indent=2))
+        elif args.list:
+            rows = client.call("containers")["rows"]
+            for short_id, name, status, ports, _running, host, _image in sorted(rows.values(), key=lambda row: (row[1], row[5])):
+                print("\t".join((host, short_id, name, status, ports)))
+        else:
+            params = json.loads(args.call[1]) if len(args.call) > 1 else {}
+            print(json.dumps(client.call(args.call[0], **params), indent=2, ensure_ascii=False))
+    except (OSError, ServiceError, docker.errors.APIError) as e:
+        print(f"Erreur du service ({SERVICE_SOCKET}) : {e}", file=sys.stderr)
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    # Vérification du singleton
-    if os.path.exists(LOCK_FILE):
+    parser = argparse.ArgumentParser(description="Docker Manager")
+    parser.add_argument("--daemon", action="store_true", help="service sans interface, servi sur le socket unix")
+    parser.add_argument("--list", action="store_true", help="affiche les conteneurs connus du service")
+    parser.add_argument("--call", nargs="+", metavar="ARG", help="appel JSON-RPC au service : méthode [paramètres JSON]")
+    parser.add_argument("--metrics", choices=("json", "prometheus"), help="affiche les durées mesurées par le service")
+    parser.add_argument("--first-paint", action="store_true", help="affiche le délai du premier affichage puis quitte")
+    args = parser.parse_args()
+    setup_logging()
+    if "DOCKER_MANAGER_SOCKET" not in os.environ:
+        prepare_service_dir(SERVICE_DIR)
+    client = ServiceClient()
+    if args.list or args.call or args.metrics:
+        sys.exit(run_cli(client, args))
+
+    # Le verrou désigne le processus qui héberge le service; le noyau le relâche même après un crash
+    lock = os.fdopen(os.open(LOCK_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_NOFOLLOW, 0o600), 'a')
+    server = None
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        if args.daemon:
+            print("Le service est déjà lancé", file=sys.stderr)
+            sys.exit(1)
         try:
-            with open(LOCK_FILE, 'r') as f:
-                pid = int(f.read().strip())
-            # Vérifier si le processus existe encore
-            if os.path.exists(f"/proc/{pid}"):
-                # Ramener la fenêtre au premier plan en cherchant par titre
-                subprocess.run(["xdotool", "search", "--name", "Docker Manager", "windowactivate"])
-                sys.exit(0)
-            else:
-                os.remove(LOCK_FILE)  # Nettoyer si le processus n'existe plus
-        except (ValueError, IOError):
-            os.remove(LOCK_FILE)  # Nettoyer si le fichier est corrompu
-
-    # Créer le fichier de verrouillage avec le PID actuel
-    with open(LOCK_FILE, 'w') as f:
-        f.write(str(os.getpid()))
+            shown = connect_service(client, "show")["shown"]
+        except ServiceError as e:
+            print(f"Erreur du service ({SERVICE_SOCKET}) : {e}", file=sys.stderr)
+            sys.exit(1)
+        if shown:
+            sys.exit(0)  # Fenêtre existante ramenée au premier plan
+        backend = RemoteBackend(client)  # Service sans interface : cette fenêtre en devient un client
+    else:
+        backend = DockerBackend(parse_docker_hosts(DOCKER_HOSTS))
+        server = ServiceServer(SERVICE_SOCKET, backend)
+        server.start()
 
     try:
-        root = ThemedTk(theme="ubuntu")
-        app = DockerManagerApp(root)
-        root.mainloop()
+        if args.daemon:
+            stopped = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+            signal.signal(signal.SIGINT, lambda *_: stopped.set())
+            backend.start()
+            logging.info(f"Service listening on {SERVICE_SOCKET}")
+            while not stopped.wait(1):
+                pass
+            backend.stop()
+        else:
+            from ttkthemes import ThemedTk  # Inutile aux modes sans interface
+            root = ThemedTk(theme="ubuntu")
+            app = DockerManagerApp(root, backend, exit_after_paint=args.first_paint)
+            backend.start()
+            root.mainloop()
     finally:
-        # Supprimer le fichier de verrouillage à la fermeture
-        if os.path.exists(LOCK_FILE):
-            os.remove(LOCK_FILE)
+        if server is not None:
+            server.stop()
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    hiddenimports=['docker'],  # Importé à la demande (lazy_import) : invisible pour l'analyse statique
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
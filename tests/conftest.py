@@ -0,0 +1,21 @@
+"""Chargement de docker-manager.py (nom de fichier non importable) pour les tests."""
+
+import importlib.util
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Module docker-manager.py, état et journaux dans un répertoire temporaire"""
+    os.environ.setdefault("DOCKER_MANAGER_STATE_DIR", tempfile.mkdtemp(prefix="docker-manager-test-state-"))
+    spec = importlib.util.spec_from_file_location("docker_manager", os.path.join(ROOT, "docker-manager.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,125 @@
+"""Tests du traducteur de commandes 'docker run' utilisé pour lancer les conteneurs via l'API."""
+
+import json
+import os
+
+import pytest
+
+COMMANDS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "container-commands.json")
+
+with open(COMMANDS, encoding="utf-8") as f:
+    SAVED_COMMANDS = json.load(f)
+
+
+# --- parse_run_command / run_spec -------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("key", sorted(SAVED_COMMANDS))
+def test_saved_commands_parse(app, key):
+    record = app.parse_run_command(SAVED_COMMANDS[key])
+    assert record["image"]
+    assert not record.get("unparsed")
+
+
+def test_ipv6_port_and_repeated_volumes(app):
+    record = app.parse_run_command(SAVED_COMMANDS["e52bbe296c8d"])
+    assert record["name"] == "attacker"
+    assert record["ports"] == ["0.0.0.0:5000:5000", ":::5000:5000"]
+    assert len(record["mounts"]) == 3
+    assert record["networks"] == ["pythonnetworkpivot_flat_network"]
+    assert record["image"] == "pythonnetworkpivot_attacker"
+    assert record["cmd"] == ["bash"]
+
+    image, cmd, kwargs, extra_networks = app.run_spec(record)
+    assert (image, cmd, extra_networks) == ("pythonnetworkpivot_attacker", ["bash"], [])
+    assert kwargs["ports"] == {"5000/tcp": [("0.0.0.0", 5000), ("::", 5000)]}
+    assert kwargs["volumes"] == record["mounts"]
+    assert kwargs["network"] == "pythonnetworkpivot_flat_network"
+    assert kwargs["name"] == "attacker"
+
+
+def test_rm_and_bound_port(app):
+    image, cmd, kwargs, _ = app.run_spec(app.parse_run_command(SAVED_COMMANDS["7d7f6137bd19"]))
+    assert image == "bkimminich/juice-shop"
+    assert cmd == ["/juice-shop/build/app.js"]
+    assert kwargs["auto_remove"] is True
+    assert kwargs["ports"] == {"3000/tcp": ("127.0.0.1", 3000)}
+
+
+def test_shell_operators_fall_back_to_cli(app):
+    record = app.parse_run_command(SAVED_COMMANDS["3dc93b35b072"])
+    assert record["networks"] == ["pythonnetworkpivot_private_net", "pythonnetworkpivot_public_net"]
+    assert record["cmd"][:2] == ["bash", "-c"]
+    with pytest.raises(ValueError):
+        app.run_spec(record)
+
+
+def test_second_network_is_connected_after_create(app):
+    record = app.parse_run_command("docker run --name victim --network a --network b img")
+    _, _, kwargs, extra_networks = app.run_spec(record)
+    assert kwargs["network"] == "a"
+    assert extra_networks == ["b"]
+
+
+def test_grouped_short_flags(app):
+    record = app.parse_run_command("docker run -dit --name shell alpine sh")
+    assert record["options"] == [["-dit", None]]
+    assert record["image"] == "alpine"
+    _, _, kwargs, _ = app.run_spec(record)
+    assert kwargs["stdin_open"] is True and kwargs["tty"] is True
+
+
+def test_inline_values_and_env(app):
+    record = app.parse_run_command("docker run --name=web -e A=1 --restart=on-failure:3 -l tier=front nginx")
+    assert record["name"] == "web"
+    _, cmd, kwargs, _ = app.run_spec(record)
+    assert cmd is None
+    assert kwargs["environment"] == ["A=1"]
+    assert kwargs["restart_policy"] == {"Name": "on-failure", "MaximumRetryCount": 3}
+    assert kwargs["labels"] == {"tier": "front"}
+
+
+def test_unknown_option_is_left_unparsed(app):
+    record = app.parse_run_command("docker run --name x --frobnicate value nginx")
+    assert record["unparsed"] is True
+    assert record["name"] == "x"
+    assert record["image"] == ""
+    assert record["cmd"] == ["--frobnicate", "value", "nginx"]
+    with pytest.raises(ValueError):
+        app.run_spec(record)
+
+
+@pytest.mark.parametrize("cmd", [
+    "docker compose up -d",
+    "sudo docker run --name x nginx",
+    "docker container run --name x nginx",
+    "./start.sh --fast",
+    "",
+])
+def test_other_commands_stay_with_the_shell(app, cmd):
+    record = app.parse_run_command(cmd)
+    assert record["unparsed"] is True
+    assert record["image"] == ""
+    assert record["name"] == ""
+    assert record["cmd"] == cmd.split()
+    with pytest.raises(ValueError):
+        app.run_spec(record)
+
+
+def test_unsupported_option_falls_back_to_cli(app):
+    with pytest.raises(ValueError):
+        app.run_spec(app.parse_run_command("docker run --gpus all cuda"))
+
+
+# --- command_fingerprint ----------------------------------------------------------------------------------------
+
+def test_fingerprint_ignores_option_order(app):
+    first = app.parse_run_command(SAVED_COMMANDS["e52bbe296c8d"])
+    reordered = app.parse_run_command(SAVED_COMMANDS["417907c51e0d"])  # Mêmes -v dans un autre ordre
+    assert first["mounts"] != reordered["mounts"]
+    assert app.command_fingerprint(first) == app.command_fingerprint(reordered)
+
+
+def test_fingerprint_distinguishes_commands(app):
+    flat = app.parse_run_command(SAVED_COMMANDS["e52bbe296c8d"])
+    public = app.parse_run_command(SAVED_COMMANDS["b0cb52ffe288"])  # Même conteneur, autre réseau
+    assert app.command_fingerprint(flat) != app.command_fingerprint(public)
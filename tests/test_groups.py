@@ -0,0 +1,33 @@
+"""Tests du lancement des groupes : options de dépendance et ordre des vagues."""
+
+import pytest
+
+
+def test_dependency_options_are_translated(app):
+    record = app.parse_run_command("docker run --name app --link db:database --volumes-from data "
+                                   "--pid container:db --ipc container:db app-image")
+    _, _, kwargs, _ = app.run_spec(record)
+    assert kwargs["links"] == {"db": "database"}
+    assert kwargs["volumes_from"] == ["data"]
+    assert kwargs["pid_mode"] == "container:db"
+    assert kwargs["ipc_mode"] == "container:db"
+    assert app.command_dependencies(record) == {"db", "data"}
+
+
+def test_launch_waves_follow_dependencies(app):
+    records = {key: app.parse_run_command(cmd) for key, cmd in {
+        "db": "docker run --name db postgres",
+        "app": "docker run --name app --link db:database app-image",
+        "web": "docker run --name web --volumes-from app --network container:app nginx",
+        "solo": "docker run --name solo --link elsewhere alpine",  # Dépendance hors du groupe ignorée
+    }.items()}
+    assert app.launch_waves(records) == [["db", "solo"], ["app"], ["web"]]
+
+
+def test_launch_waves_reject_cycles(app):
+    records = {key: app.parse_run_command(cmd) for key, cmd in {
+        "a": "docker run --name a --link b alpine",
+        "b": "docker run --name b --volumes-from a alpine",
+    }.items()}
+    with pytest.raises(ValueError):
+        app.launch_waves(records)
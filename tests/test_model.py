@@ -0,0 +1,38 @@
+"""Tests du modèle des conteneurs : listings périmés, événements reçus pendant un listing et hôtes muets."""
+
+
+def summary(cid, name, state="running"):
+    return {"Id": cid * 8, "Names": [f"/{name}"], "State": state, "Ports": [], "ImageID": "sha256:img"}
+
+
+def rows(app, *summaries, host="local"):
+    return {item["Id"]: app.summary_row(item, host) for item in summaries}
+
+
+def test_stale_listing_is_ignored(app):
+    model = app.ContainerModel()
+    older = model.begin_sync()
+    newer = model.begin_sync()
+    assert model.replace_all(rows(app, summary("a", "new")), newer) is not None
+    assert model.replace_all(rows(app, summary("a", "old")), older) is None
+    assert model.get("a" * 8)[1] == "new"
+
+
+def test_listing_keeps_newer_events(app):
+    model = app.ContainerModel()
+    generation = model.begin_sync()
+    started = app.summary_row(summary("a", "web"), "local")
+    model.upsert("a" * 8, started)  # Événement reçu pendant le listing
+    _, removed = model.replace_all(rows(app, summary("a", "web", "exited")), generation)
+    assert model.get("a" * 8) == started
+    assert removed == []
+
+
+def test_hosts_that_did_not_answer_are_kept(app):
+    model = app.ContainerModel()
+    model.replace_all({**rows(app, summary("a", "web")), **rows(app, summary("b", "db"), host="remote")},
+                      model.begin_sync())
+    changed, removed = model.replace_all(rows(app, summary("c", "cache")), model.begin_sync(), hosts={"local"})
+    assert set(model.snapshot()) == {"b" * 8, "c" * 8}
+    assert removed == ["a" * 8]
+    assert list(changed) == ["c" * 8]